@@ -4,10 +4,40 @@ from .contract import (
     ContractLine,
     get_end_of_month_range,
     annualize_df,
+    annualize_long_df,
 )
-from .annualize import annualize, get_contract_term, active_check, deferred_check
+from .annualize import (
+    annualize,
+    annualize_array,
+    get_contract_term,
+    get_contract_term_array,
+    active_check,
+    deferred_check,
+)
+from .instrument import Instrumentation
+from .periods import Calendar, get_calendar
 from .utils import explain_code
 
-import pandas as pd
+import importlib
+
+# imported on first access, keeps `import arr` light
+_LAZY = {
+    "ContractBook": ".book",
+    "CustomerCube": ".cube",
+    "ARRIndex": ".query",
+    "CubeRollups": ".rollup",
+    "validate_contracts": ".validate",
+    "retention_df": ".retention",
+    "link_renewals": ".renewal",
+    "annualize_snapshots_df": ".snapshot",
+    "simulate_arr_paths": ".forecast",
+    "forecast_arr_df": ".forecast",
+}
+
 
-pd.set_option("display.max_columns", 100)
+def __getattr__(name: str):
+    if name in _LAZY:
+        value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
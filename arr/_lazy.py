@@ -0,0 +1,41 @@
+import importlib
+from types import ModuleType
+from typing import Callable
+
+
+class LazyModule(ModuleType):
+    """Stand-in for a module that is only imported on first attribute access.
+
+    Lets `import arr` (and the scalar `annualize` / `Contract` API) skip
+    importing numpy & pandas until something actually uses them.
+
+    Args:
+        name (str): Module to import, e.g. `"pandas"`.
+        on_import (Callable): Optional, called with the module once it's imported.
+    """
+
+    def __init__(self, name: str, on_import: Callable[[ModuleType], None] = None):
+        super().__init__(name)
+        self._on_import = on_import
+        self._module = None
+
+    def _load(self) -> ModuleType:
+        if self._module is None:
+            self._module = importlib.import_module(self.__name__)
+            if self._on_import is not None:
+                self._on_import(self._module)
+        return self._module
+
+    def __getattr__(self, attr: str):
+        value = getattr(self._load(), attr)
+        # cache it, later lookups won't go through `__getattr__`
+        setattr(self, attr, value)
+        return value
+
+
+def _set_pandas_options(pd: ModuleType):
+    pd.set_option("display.max_columns", 100)
+
+
+np = LazyModule("numpy")
+pd = LazyModule("pandas", _set_pandas_options)
@@ -1,3 +1,6 @@
+from __future__ import annotations
+from ._lazy import np
+
 from typing import TYPE_CHECKING
 from datetime import date, timedelta
 from typing import Literal
@@ -7,8 +10,6 @@ from calendar import isleap
 # if TYPE_CHECKING:
 #     from .contract import Contract, ContractLine
 
-from dateutil.relativedelta import relativedelta
-import numpy as np
 
 
 def get_end_of_month_range(start: date, end: date) -> np.ndarray:
@@ -21,6 +22,8 @@ def get_end_of_month_range(start: date, end: date) -> np.ndarray:
     Returns:
         ndarray: Numpy array of dates inbetween.
     """
+    from dateutil.relativedelta import relativedelta
+
     assert end > start, "end date must be later than start date"
     end_of_month_range = []
     working_date = start
@@ -54,6 +57,15 @@ def deferred_check(
     )
 
 
+def _leap_days_through(day: date) -> int:
+    """# of Feb 29s from year 1 up to and including `day`."""
+    prior = day.year - 1
+    count = prior // 4 - prior // 100 + prior // 400
+    if isleap(day.year) and day >= date(day.year, 2, 29):
+        count += 1
+    return count
+
+
 def count_leap_days(start_date: date, end_date: date) -> int:
     """Helper function to output the # of leap days in date range.
 
@@ -64,15 +76,11 @@ def count_leap_days(start_date: date, end_date: date) -> int:
     Returns:
         int: Number of leap days in the range of dates.
     """
-    leap_check = start_date.year
-    leap_days = []
-    while leap_check <= end_date.year:
-        if isleap(leap_check):
-            leap_days.append(date(leap_check, 2, 29))
-        leap_check += 1
-
-    leap_count = len([*filter(lambda x: start_date <= x <= end_date, leap_days)])
-    return leap_count
+    if start_date > end_date:
+        return 0
+    return _leap_days_through(end_date) - _leap_days_through(
+        start_date - timedelta(days=1)
+    )
 
 
 INTERVAL = Literal["Year", "Quarter", "Month", "Day"]
@@ -181,3 +189,134 @@ def annualize(
         fraction = 0
 
     return contract.amount * (fraction)
+
+
+
+def _as_days(dates) -> np.ndarray:
+    """Coerce dates, Timestamps or datetime64 array-likes to `datetime64[D]`."""
+    return np.asarray(dates, dtype="datetime64[D]")
+
+
+def _leap_days_through_array(dates: np.ndarray) -> np.ndarray:
+    """Vectorized `_leap_days_through` for a `datetime64[D]` array."""
+    years = dates.astype("datetime64[Y]")
+    year = years.astype(np.int64) + 1970
+    prior = year - 1
+    count = prior // 4 - prior // 100 + prior // 400
+    is_leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+    # Jan 1 + 59 days is Feb 29 in a leap year
+    feb_29 = years.astype("datetime64[D]") + np.timedelta64(59, "D")
+    return count + (is_leap & (dates >= feb_29))
+
+
+def count_leap_days_array(start_dates, end_dates) -> np.ndarray:
+    """Array version of `count_leap_days`.
+
+    Args:
+        start_dates (array-like): Start dates of contracts.
+        end_dates (array-like): End dates of contracts.
+
+    Returns:
+        ndarray: Number of leap days in each range of dates.
+    """
+    start_dates = _as_days(start_dates)
+    end_dates = _as_days(end_dates)
+    count = _leap_days_through_array(end_dates) - _leap_days_through_array(
+        start_dates - np.timedelta64(1, "D")
+    )
+    return np.maximum(count, 0)
+
+
+def get_contract_term_array(
+    start_dates, end_dates, generalize_leap_year: bool, interval_str: INTERVAL
+) -> np.ndarray:
+    """Array version of `get_contract_term`.
+
+    Args:
+        start_dates (array-like): Start dates of contracts.
+        end_dates (array-like): End dates of contracts.
+        generalize_leap_year (bool): Hard code 365 or add the extra day if `True`.
+        interval_str (INTERVAL): see `INTERVAL` variable for possible options.
+
+    Returns:
+        ndarray: Contract Term # of each contract.
+    """
+    start_dates = _as_days(start_dates)
+    end_dates = _as_days(end_dates)
+    math_end_dates = end_dates + np.timedelta64(1, "D")
+
+    if interval_str == "Day":
+        contract_term_length_day = (math_end_dates - start_dates).astype(np.int64)
+        if not generalize_leap_year:
+            return contract_term_length_day
+        return contract_term_length_day - count_leap_days_array(
+            start_dates, end_dates
+        )
+
+    contract_term_length_month = math_end_dates.astype("datetime64[M]").astype(
+        np.int64
+    ) - start_dates.astype("datetime64[M]").astype(np.int64)
+
+    if interval_str == "Month":
+        return contract_term_length_month
+    if interval_str == "Quarter":
+        return contract_term_length_month // 3
+    if interval_str == "Year":
+        return contract_term_length_month // 12
+    raise KeyError(interval_str)
+
+
+def annualize_array(
+    amounts,
+    start_dates,
+    end_dates,
+    periods=None,
+    interval_str: INTERVAL = "Month",
+    generalize_leap_year: bool = True,
+) -> np.ndarray:
+    """Array version of `annualize`.
+
+    Annualizes many amounts at once, the same way `annualize` does
+    for a single `ContractHeader` or `ContractLine`.
+
+    Args:
+        amounts (array-like): Total value of each contract (or line).
+        start_dates (array-like): Start dates of contracts.
+        end_dates (array-like): End dates of contracts.
+        periods (array-like): The dates in which we are looking at the ARR.
+            Only needed for "Day" when `generalize_leap_year` is `False`.
+        interval_str (INTERVAL): see `INTERVAL` variable for possible options.
+        generalize_leap_year (bool): See `annualize`.
+
+    Returns:
+        ndarray: Annual Contract Value of each contract.
+
+    Raises:
+        ValueError: `periods` is needed but not given.
+    """
+
+    # 1
+    if interval_str == "Day" and not generalize_leap_year:
+        if periods is None:
+            raise ValueError(
+                'periods is needed for "Day" when generalize_leap_year is False'
+            )
+        years = _as_days(periods).astype("datetime64[Y]").astype(np.int64) + 1970
+        time_interval = 365 + (
+            (years % 4 == 0) & ((years % 100 != 0) | (years % 400 == 0))
+        )
+    else:
+        time_interval = {"Year": 1, "Quarter": 4, "Month": 12, "Day": 365}[
+            interval_str
+        ]
+
+    # 2
+    contract_term = get_contract_term_array(
+        start_dates, end_dates, generalize_leap_year, interval_str
+    )
+
+    # 3
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fraction = np.where(contract_term == 0, 0, time_interval / contract_term)
+
+    return np.asarray(amounts) * fraction
@@ -0,0 +1,4 @@
+# renewal assumptions shared by the sample book & the forecast
+RENEWAL_CHANCE = 0.8
+EXPANSION_CHANCE = 0.1
+DOWNGRADE_CHANCE = 0.1
@@ -0,0 +1,260 @@
+from __future__ import annotations
+from .contract import (
+    DATE_COLUMNS,
+    HEADER_COLUMNS,
+    LINE_COLUMNS,
+    Contract,
+    ContractHeader,
+    ContractLine,
+    annualize_df,
+    contracts_to_df,
+    repr_builder,
+)
+
+from datetime import date
+from typing import Iterable, Iterator
+
+import numpy as np
+import pandas as pd
+
+
+def _to_date(value: np.datetime64) -> date:
+    return value.astype("datetime64[D]").item()
+
+
+class HeaderView:
+    """Read only `ContractHeader` look-alike backed by a `ContractBook` header."""
+
+    __slots__ = ("book", "index")
+
+    def __init__(self, book: ContractBook, index: int):
+        self.book = book
+        self.index = index
+
+    @property
+    def amount(self):
+        return self.book.headers["header.amount"][self.index].item()
+
+    @property
+    def start_date(self) -> date:
+        return _to_date(self.book.headers["header.start_date"][self.index])
+
+    @property
+    def end_date(self) -> date:
+        return _to_date(self.book.headers["header.end_date"][self.index])
+
+    @property
+    def booking_date(self) -> date:
+        return _to_date(self.book.headers["header.booking_date"][self.index])
+
+    def to_header(self) -> ContractHeader:
+        return ContractHeader(
+            self.amount, self.start_date, self.end_date, self.booking_date
+        )
+
+
+class LineView:
+    """Read only `ContractLine` look-alike backed by a `ContractBook` line."""
+
+    __slots__ = ("book", "index")
+
+    def __init__(self, book: ContractBook, index: int):
+        self.book = book
+        self.index = index
+
+    @property
+    def amount(self):
+        return self.book.lines["line.amount"][self.index].item()
+
+    @property
+    def start_date(self) -> date:
+        return _to_date(self.book.lines["line.start_date"][self.index])
+
+    @property
+    def end_date(self) -> date:
+        return _to_date(self.book.lines["line.end_date"][self.index])
+
+    @property
+    def product(self):
+        return self.book.lines["line.product"][self.index]
+
+    @property
+    def renewable(self) -> bool:
+        return bool(self.book.lines["line.renewable"][self.index])
+
+    def to_line(self) -> ContractLine:
+        return ContractLine(
+            self.amount, self.start_date, self.end_date, self.product, self.renewable
+        )
+
+
+class ContractView:
+    """Read only `Contract` look-alike over one contract of a `ContractBook`.
+
+    Holds nothing but a reference to the book & the contract position,
+    `header` and `lines` are views as well.
+    """
+
+    __slots__ = ("book", "index")
+
+    def __init__(self, book: ContractBook, index: int):
+        self.book = book
+        self.index = index
+
+    def __repr__(self) -> str:
+        return repr_builder(self)
+
+    @property
+    def id(self) -> int:
+        return self.book.headers["id"][self.index].item()
+
+    @property
+    def customer(self):
+        return self.book.headers["customer"][self.index]
+
+    @property
+    def header(self) -> HeaderView:
+        return HeaderView(self.book, self.index)
+
+    @property
+    def lines(self) -> list[LineView]:
+        start, end = self.book.line_offsets[self.index : self.index + 2]
+        return [LineView(self.book, i) for i in range(start, end)]
+
+    def to_contract(self) -> Contract:
+        return Contract(
+            self.id,
+            self.header.to_header(),
+            [line.to_line() for line in self.lines],
+            self.customer,
+        )
+
+    def to_df(self) -> pd.DataFrame:
+        return self.book.take([self.index]).to_df()
+
+
+class ContractBook:
+    """Columnar (struct-of-arrays) store of many contracts.
+
+    Header columns are held as one array per column with an entry per
+    contract, line columns as one array per column with an entry per line.
+    Ids are int64, dates datetime64[ns], customer & product categorical
+    and renewable bool. The lines of the i-th contract are
+    `line_offsets[i]:line_offsets[i + 1]`.
+
+    Args:
+        headers (dict): Column name to array, see `arr.contract.HEADER_COLUMNS`.
+        lines (dict): Column name to array, see `arr.contract.LINE_COLUMNS`.
+        line_offsets (ndarray): Start of each contract's lines, plus the
+            total number of lines at the end.
+
+    Example:
+        book = ContractBook.from_df(CONTRACTS)
+        book.get(121)  # ContractView, prints like a `Contract`
+        annualize_df(book.to_df())
+    """
+
+    def __init__(self, headers: dict, lines: dict, line_offsets: np.ndarray):
+        self.headers = headers
+        self.lines = lines
+        self.line_offsets = line_offsets
+        self._positions = None
+
+    def __len__(self) -> int:
+        return len(self.line_offsets) - 1
+
+    def __iter__(self) -> Iterator[ContractView]:
+        return (ContractView(self, i) for i in range(len(self)))
+
+    def __getitem__(self, index: int) -> ContractView:
+        if not -len(self) <= index < len(self):
+            raise IndexError(index)
+        return ContractView(self, index % len(self))
+
+    @property
+    def ids(self) -> np.ndarray:
+        return self.headers["id"]
+
+    def get(self, contract_id: int) -> ContractView:
+        """Get the contract with `id == contract_id`."""
+        if self._positions is None:
+            self._positions = pd.Index(self.ids)
+        return ContractView(self, self._positions.get_loc(contract_id))
+
+    def take(self, positions) -> ContractBook:
+        """New book with only the contracts at `positions`."""
+        positions = np.asarray(positions, dtype=np.int64)
+        starts = self.line_offsets[positions]
+        counts = self.line_offsets[positions + 1] - starts
+        line_offsets = np.r_[0, np.cumsum(counts)].astype(np.int64)
+        line_idx = np.repeat(starts - line_offsets[:-1], counts) + np.arange(
+            line_offsets[-1]
+        )
+        return ContractBook(
+            {col: values[positions] for col, values in self.headers.items()},
+            {col: values[line_idx] for col, values in self.lines.items()},
+            line_offsets,
+        )
+
+    @staticmethod
+    def from_df(df: pd.DataFrame) -> ContractBook:
+        """Build a book from a DataFrame in the `Contract.to_df` layout.
+
+        Line columns already in the right dtype are used as is. Rows are
+        only reordered (stable, by first appearance of `id`) if the
+        lines of a contract are not already next to each other.
+        """
+        codes, _ = pd.factorize(df["id"].to_numpy(np.int64))
+        if len(codes) and (np.diff(codes) < 0).any():
+            order = np.argsort(codes, kind="stable")
+            df, codes = df.iloc[order], codes[order]
+
+        first = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+        line_offsets = np.r_[first, len(codes)].astype(np.int64)
+
+        headers, lines = {}, {}
+        for col in HEADER_COLUMNS + LINE_COLUMNS:
+            values = df[col]
+            if col == "id":
+                values = values.to_numpy(np.int64)
+            elif col in DATE_COLUMNS:
+                values = values.to_numpy("datetime64[ns]")
+            elif col in ("customer", "line.product"):
+                values = pd.Categorical(values)
+            elif col == "line.renewable":
+                values = values.to_numpy(bool)
+            else:
+                values = values.to_numpy()
+
+            if col in HEADER_COLUMNS:
+                headers[col] = values[first]
+            else:
+                lines[col] = values
+
+        return ContractBook(headers, lines, line_offsets)
+
+    @staticmethod
+    def from_contracts(contracts: Iterable[Contract]) -> ContractBook:
+        """Build a book from `Contract` objects."""
+        return ContractBook.from_df(contracts_to_df(contracts))
+
+    def to_df(self) -> pd.DataFrame:
+        """Converts to the `Contract.to_df` layout.
+
+        Line columns are handed to pandas without a copy, header columns
+        are repeated once per line.
+        """
+        counts = np.diff(self.line_offsets)
+        columns = {}
+        for col, values in self.headers.items():
+            if isinstance(values, pd.Categorical):
+                columns[col] = pd.Categorical.from_codes(
+                    np.repeat(values.codes, counts), dtype=values.dtype
+                )
+            else:
+                columns[col] = np.repeat(values, counts)
+        columns.update(self.lines)
+        return pd.DataFrame(columns, copy=False)
+
+    def to_annualize_df(self, *args, **kwargs) -> pd.DataFrame:
+        return annualize_df(self.to_df(), *args, **kwargs)
@@ -0,0 +1,131 @@
+from __future__ import annotations
+from .contract import annualize_df
+
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+CACHE_VERSION = 1
+INDEX_COLUMNS = ["customer", "id", "line.product"]
+
+
+def hash_contracts(df: pd.DataFrame, **options) -> str:
+    """Content hash of a contract DataFrame & the annualization options.
+
+    Args:
+        df (pd.DataFrame): Contracts in the `Contract.to_df` layout.
+        **options: Anything else the cube depends on, e.g. `by_lines`.
+
+    Returns:
+        str: Hex digest, changes whenever a value, column, dtype or option does.
+    """
+    digest = hashlib.sha256()
+    digest.update(repr((CACHE_VERSION, sorted(options.items()))).encode())
+    digest.update(
+        repr([(col, str(dtype)) for col, dtype in df.dtypes.items()]).encode()
+    )
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+class CubeCache:
+    """On-disk cache of `annualize_df` results, keyed by `hash_contracts`.
+
+    Cubes are stored as Feather files (needs `pyarrow`). Changing the
+    contracts or the options changes the key, so stale cubes are never
+    read, they just age out: once the directory is over `max_bytes` the
+    least recently used files are deleted.
+
+    Args:
+        directory (str | Path): Where to keep the files. Created if missing.
+        max_bytes (int): Size limit of the directory.
+
+    Example:
+        cache = CubeCache(".arr_cache")
+        df = cache.annualize_df(CONTRACTS)  # computed & stored
+        df = cache.annualize_df(CONTRACTS)  # read from disk
+    """
+
+    def __init__(self, directory: str | Path = ".arr_cache", max_bytes: int = 2**30):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.feather"
+
+    def get(self, key: str) -> pd.DataFrame | None:
+        """Read a cube, `None` if it isn't cached or can't be read."""
+        path = self._path(key)
+        if not path.exists():
+            return None
+        try:
+            os.utime(path)
+            df = pd.read_feather(path).set_index(INDEX_COLUMNS)
+        except (OSError, ValueError):
+            # evicted in between or not a Feather file, rebuild it
+            return None
+
+        columns = [col.split("|") for col in df.columns]
+        df.columns = pd.MultiIndex.from_arrays(
+            [
+                pd.Index([name for name, _ in columns], dtype="str"),
+                pd.to_datetime([period for _, period in columns]).astype(
+                    "datetime64[ns]"
+                ),
+            ],
+            names=[None, "period"],
+        )
+        return df
+
+    def put(self, key: str, df: pd.DataFrame):
+        """Write a cube, then evict down to `max_bytes`.
+
+        The file is written next to its final path & moved into place, so
+        a reader never sees a partly written cube.
+        """
+        flat = df.copy()
+        flat.columns = [f"{name}|{period.isoformat()}" for name, period in df.columns]
+        fd, tmp = tempfile.mkstemp(suffix=".tmp", dir=self.directory)
+        os.close(fd)
+        try:
+            flat.reset_index().to_feather(tmp)
+            os.replace(tmp, self._path(key))
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        self.evict()
+
+    def evict(self):
+        """Delete least recently used cubes until the directory fits `max_bytes`."""
+        files = sorted(
+            self.directory.glob("*.feather"), key=lambda p: p.stat().st_mtime
+        )
+        total = sum(path.stat().st_size for path in files)
+        for path in files:
+            if total <= self.max_bytes:
+                break
+            total -= path.stat().st_size
+            path.unlink()
+
+    def clear(self):
+        for path in self.directory.glob("*.feather"):
+            path.unlink()
+
+    def annualize_df(
+        self,
+        df: pd.DataFrame,
+        by_lines: bool = True,
+        arr: bool = True,
+        deferred: bool = True,
+    ) -> pd.DataFrame:
+        """Cached `annualize_df`."""
+        key = hash_contracts(df, by_lines=by_lines, arr=arr, deferred=deferred)
+        cube = self.get(key)
+        if cube is None:
+            cube = annualize_df(df, by_lines, arr, deferred)
+            self.put(key, cube)
+        return cube
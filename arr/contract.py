@@ -1,12 +1,29 @@
 from __future__ import annotations
-from .annualize import annualize, active_check, deferred_check, get_end_of_month_range
+from ._lazy import np, pd
+from .instrument import stage
+from .annualize import annualize_array, get_end_of_month_range, INTERVAL
+from .periods import GRANULARITY, get_calendar
 
 from dataclasses import dataclass
 from datetime import date
-from typing import List
-
-import pandas as pd
-
+from typing import Iterable, Iterator, List
+
+HEADER_COLUMNS = [
+    "id",
+    "customer",
+    "header.amount",
+    "header.start_date",
+    "header.end_date",
+    "header.booking_date",
+]
+LINE_COLUMNS = [
+    "line.amount",
+    "line.start_date",
+    "line.end_date",
+    "line.product",
+    "line.renewable",
+]
+DATE_COLUMNS = [col for col in HEADER_COLUMNS + LINE_COLUMNS if "date" in col]
 
 
 @dataclass
@@ -100,7 +117,7 @@ class Contract:
 
     def __post_init__(self):
         if self.customer is None:
-            self.customer = 'Example Customer'
+            self.customer = "Example Customer"
 
     def to_df(self) -> pd.DataFrame:
         """Converts to usable DataFrame.
@@ -153,77 +170,689 @@ class Contract:
         )
 
 
+def contracts_to_df(contracts: Iterable[Contract]) -> pd.DataFrame:
+    """Many-contract version of `Contract.to_df`.
 
-def annualize_df(
-    df, by_lines: bool = True, arr: bool = True, deferred: bool = True
-) -> pd.DataFrame:
-    # TODO: use  *args, **kwargs for more dynamic annualize func
-    # pass through all the options
+    Fills one list per column and builds the DataFrame once, instead of
+    calling `to_df` per contract and concatenating.
+
+    Args:
+        contracts (Iterable[Contract]): Contracts to convert.
+
+    Returns:
+        pd.DataFrame: Same layout as `Contract.to_df`, one row per line.
+    """
+    columns = {col: [] for col in HEADER_COLUMNS + LINE_COLUMNS}
+    for contract in contracts:
+        header = contract.header
+        for line in contract.lines:
+            columns["id"].append(contract.id)
+            columns["customer"].append(contract.customer)
+            columns["header.amount"].append(header.amount)
+            columns["header.start_date"].append(header.start_date)
+            columns["header.end_date"].append(header.end_date)
+            columns["header.booking_date"].append(header.booking_date)
+            columns["line.amount"].append(line.amount)
+            columns["line.start_date"].append(line.start_date)
+            columns["line.end_date"].append(line.end_date)
+            columns["line.product"].append(line.product)
+            columns["line.renewable"].append(line.renewable)
+
+    df = pd.DataFrame(columns)
+    for col in DATE_COLUMNS:
+        df[col] = df[col].astype("datetime64[ns]")
+
+    return df
+
+
+def contracts_from_df(df: pd.DataFrame, block_size: int = 10_000) -> Iterator[Contract]:
+    """Many-contract version of `Contract.from_df`.
+
+    Lines are grouped by `id`, in order of first appearance. Columns
+    stay arrays, they are converted to Python objects one block
+    of `block_size` contracts at a time, as the contracts are yielded.
 
+    Args:
+        df (pd.DataFrame): Contracts in the `Contract.to_df` layout.
+        block_size (int): Contracts converted at once.
+
+    Yields:
+        Contract: One per unique `id`.
+    """
+    codes, _ = pd.factorize(df["id"])
+    order = np.argsort(codes, kind="stable")
+    bounds = np.flatnonzero(np.diff(codes[order])) + 1
+    bounds = np.r_[0, bounds, len(order)]
+    arrays = {col: df[col].array for col in HEADER_COLUMNS + LINE_COLUMNS}
+
+    for first in range(0, len(bounds) - 1, block_size):
+        # 1
+        block = bounds[first : first + block_size + 1]
+        rows = order[block[0] : block[-1]]
+        columns = {}
+        for col, values in arrays.items():
+            values = np.asarray(values.take(rows))
+            if col in DATE_COLUMNS:
+                values = values.astype("datetime64[D]")
+            columns[col] = values.tolist()
+
+        # 2
+        block = (block - block[0]).tolist()
+        for start, end in zip(block[:-1], block[1:]):
+            if start == end:
+                continue
+            yield Contract(
+                columns["id"][start],
+                ContractHeader(
+                    columns["header.amount"][start],
+                    columns["header.start_date"][start],
+                    columns["header.end_date"][start],
+                    columns["header.booking_date"][start],
+                ),
+                [
+                    ContractLine(*line)
+                    for line in zip(
+                        columns["line.amount"][start:end],
+                        columns["line.start_date"][start:end],
+                        columns["line.end_date"][start:end],
+                        columns["line.product"][start:end],
+                        columns["line.renewable"][start:end],
+                    )
+                ],
+                columns["customer"][start],
+            )
+
+
+def get_periods(df: pd.DataFrame, granularity: GRANULARITY = "Month") -> np.ndarray:
+    """Periods spanned by every date column of a contract DataFrame.
+
+    Same range `annualize_df` has always used: for "Month" the
+    `get_end_of_month_range` from the earliest to the latest date
+    found in `df`. Comes from the memoized `get_calendar`.
+
+    Args:
+        df (pd.DataFrame): Contracts in the `Contract.to_df` layout.
+        granularity (GRANULARITY): "Day", "Month", "Quarter" or "Year".
+
+    Returns:
+        ndarray: Read-only `datetime64[D]` array of period end dates.
+    """
     min_date = min(df.select_dtypes("datetime64").min()).date()
     max_date = max(df.select_dtypes("datetime64").max()).date()
+    return get_calendar(min_date, max_date, granularity).periods
 
-    range = pd.DataFrame(get_end_of_month_range(min_date, max_date)).rename(
-        columns={0: "period"}
-    )
-    df = range.merge(df, how="cross")
 
-    df["period"] = df["period"].astype("datetime64[ns]")
+def period_windows(
+    df: pd.DataFrame, periods, by_lines: bool = True, deferred: bool = True
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Get the window of periods each line is deferred & active in.
 
+    The active window of a line is found with `searchsorted` on
+    `periods`, a deferred line is deferred in every period before its
+    header start. Same rules as `active_check` and `deferred_check`.
+
+    Args:
+        df (pd.DataFrame): Contracts in the `Contract.to_df` layout.
+        periods (array-like): Sorted period dates, see `get_periods`.
+        by_lines (bool): Use the line dates if `True`, else the header dates.
+        deferred (bool): Include deferred periods.
+
+    Returns:
+        tuple[ndarray, ndarray, ndarray]: Per line, the number of deferred
+            periods (from the first period on), the position of the first
+            active period and the number of active periods.
+    """
+    periods = np.asarray(periods, dtype="datetime64[D]")
     col_name = "line" if by_lines else "header"
 
-    df["active"] = df.apply(
-        lambda row: active_check(
-            row[f"{col_name}.start_date"],
-            row[f"{col_name}.end_date"],
-            row["period"],
-        ),
-        axis=1,
+    # 1
+    start_date = df[f"{col_name}.start_date"].to_numpy("datetime64[D]")
+    end_date = df[f"{col_name}.end_date"].to_numpy("datetime64[D]")
+    active_start = np.searchsorted(periods, start_date, "left")
+    active_count = np.maximum(
+        np.searchsorted(periods, end_date, "right") - active_start, 0
     )
 
-    df["deferred"] = df.apply(
-        lambda row: deferred_check(
-            row["header.booking_date"],
-            row["header.start_date"],
-            row["line.start_date"],
-            row["period"],
-        ),
-        axis=1,
+    # 2
+    if deferred:
+        header_start_date = df["header.start_date"].to_numpy("datetime64[D]")
+        is_deferred = (
+            df["header.booking_date"].to_numpy("datetime64[D]") < header_start_date
+        ) & (df["line.start_date"].to_numpy("datetime64[D]") == header_start_date)
+        deferred_count = np.where(
+            is_deferred, np.searchsorted(periods, header_start_date, "left"), 0
+        )
+    else:
+        deferred_count = np.zeros(len(df), dtype=np.int64)
+
+    return deferred_count, active_start, active_count
+
+
+def expand_periods(
+    df: pd.DataFrame, periods, by_lines: bool = True, deferred: bool = True
+) -> tuple[np.ndarray, np.ndarray]:
+    """Get the (line, period) pairs where a line is active or deferred.
+
+    Instead of crossing every line with every period and filtering,
+    only the periods inside the windows from `period_windows` are emitted.
+
+    Args:
+        df (pd.DataFrame): Contracts in the `Contract.to_df` layout.
+        periods (array-like): Sorted period dates, see `get_periods`.
+        by_lines (bool): Use the line dates if `True`, else the header dates.
+        deferred (bool): Include deferred periods.
+
+    Returns:
+        tuple[ndarray, ndarray]: Row positions in `df` and positions
+            in `periods`, one entry per (line, period) pair.
+    """
+    deferred_count, active_start, active_count = period_windows(
+        df, periods, by_lines, deferred
     )
 
+    counts = deferred_count + active_count
+    line_idx = np.repeat(np.arange(len(df)), counts)
+    offset = np.arange(len(line_idx)) - np.repeat(np.cumsum(counts) - counts, counts)
+    line_deferred_count = deferred_count[line_idx]
+    period_idx = np.where(
+        offset < line_deferred_count,
+        offset,
+        active_start[line_idx] + offset - line_deferred_count,
+    )
+
+    return line_idx, period_idx
+
+
+def annualize_lines(
+    df: pd.DataFrame,
+    periods,
+    by_lines: bool = True,
+    interval_str: INTERVAL = "Month",
+    generalize_leap_year: bool = True,
+) -> tuple[np.ndarray, np.ndarray | None]:
+    """Annualized amount of every line, and a scale per period if needed.
+
+    The amount only depends on the period for "Day" without
+    `generalize_leap_year`, a leap year has 366 days. Then the amounts
+    are for a 365 day year and the scale is 366 / 365 in periods that
+    end in a leap year, otherwise the scale is `None`. The leap year
+    flags are read from the memoized "Day" `get_calendar` of the periods.
+
+    Args:
+        df (pd.DataFrame): Contracts in the `Contract.to_df` layout.
+        periods (array-like): Periods that will be built.
+        by_lines (bool): Use the line dates if `True`, else the header dates.
+        interval_str (INTERVAL): See `annualize`.
+        generalize_leap_year (bool): See `annualize`.
+
+    Returns:
+        tuple[ndarray, ndarray | None]: Amount per line, scale per period.
+    """
+    col_name = "line" if by_lines else "header"
+    amounts = df["line.amount"].to_numpy()
+    start_date = df[f"{col_name}.start_date"].to_numpy("datetime64[D]")
+    end_date = df[f"{col_name}.end_date"].to_numpy("datetime64[D]")
+
+    if interval_str == "Day" and not generalize_leap_year:
+        # 1970 isn't a leap year
+        amount = annualize_array(
+            amounts, start_date, end_date, np.datetime64("1970-01-01"), "Day", False
+        )
+        periods = np.atleast_1d(np.asarray(periods, dtype="datetime64[D]"))
+        if not len(periods):
+            return amount, np.ones(0)
+        first = periods.min()
+        days = get_calendar(first.item(), periods.max().item(), "Day")
+        is_leap = days.is_leap[(periods - first).astype(np.int64)]
+        return amount, (365 + is_leap) / 365
+
+    amount = annualize_array(
+        amounts, start_date, end_date, None, interval_str, generalize_leap_year
+    )
+    return amount, None
+
+
+def annualize_long_df(
+    df,
+    by_lines: bool = True,
+    arr: bool = True,
+    deferred: bool = True,
+    periods=None,
+    interval_str: INTERVAL = "Month",
+    generalize_leap_year: bool = True,
+    granularity: GRANULARITY = "Month",
+) -> pd.DataFrame:
+    """Long form of `annualize_df`, before the periods are unstacked.
+
+    Args:
+        df (pd.DataFrame): Contracts in the `Contract.to_df` layout.
+        by_lines (bool): Use the line dates if `True`, else the header dates.
+        arr (bool): Only keep renewable lines & name the value `ARR`,
+            otherwise keep everything & name it `ACV`.
+        deferred (bool): Include deferred periods.
+        periods (array-like): Periods to build. Defaults to
+            `get_periods(df, granularity)`.
+        interval_str (INTERVAL): See `annualize`.
+        generalize_leap_year (bool): See `annualize`.
+        granularity (GRANULARITY): "Day", "Month", "Quarter" or "Year"
+            periods, see `get_calendar`.
+
+    Returns:
+        pd.DataFrame: One `ARR` | `ACV` column indexed by
+            (period, customer, id, line.product).
+    """
+    if periods is None:
+        periods = get_periods(df, granularity)
+    periods = np.asarray(periods, dtype="datetime64[D]")
+
+    if arr:
+        df = df[df["line.renewable"] == True]
+
     annualize_name = "ARR" if arr else "ACV"
+    cols = ["period", "customer", "id", "line.product"]
+
+    with stage("annualize", len(df)) as s:
+        amount, scale = annualize_lines(
+            df, periods, by_lines, interval_str, generalize_leap_year
+        )
+        s.rows_out = len(amount)
+
+    with stage("expand_periods", len(df)) as s:
+        line_idx, period_idx = expand_periods(df, periods, by_lines, deferred)
+        s.rows_out = len(line_idx)
+
+    with stage("cells", len(line_idx)) as s:
+        cells = df[cols[1:]].iloc[line_idx].reset_index(drop=True)
+        cells.insert(0, "period", periods[period_idx].astype("datetime64[ns]"))
+        cells[annualize_name] = amount[line_idx]
+        if scale is not None:
+            cells[annualize_name] *= scale[period_idx]
+        s.rows_out = len(cells)
+
+    with stage("groupby", len(cells)) as s:
+        df = pd.DataFrame(cells.groupby(cols).sum())
+        s.rows_out = len(df)
+
+    return df
+
+
+def period_codes(periods, granularity: GRANULARITY = "Month") -> np.ndarray:
+    """Period end dates to int32 codes, same codes as `get_calendar`.
+
+    Months since 1970-01, or days since 1970-01-01 for "Day".
+    """
+    periods = np.asarray(periods, dtype="datetime64[D]")
+    if granularity != "Day":
+        periods = periods.astype("datetime64[M]")
+    return periods.astype(np.int64).astype(np.int32)
+
+
+def period_dates(codes, granularity: GRANULARITY = "Month") -> np.ndarray:
+    """Int32 codes back to `datetime64[D]` period end dates."""
+    codes = np.asarray(codes, dtype=np.int64)
+    if granularity == "Day":
+        return codes.astype("datetime64[D]")
+    months = codes.astype("datetime64[M]")
+    return (months + 1).astype("datetime64[D]") - np.timedelta64(1, "D")
+
+
+def annualize_compact_df(
+    df,
+    by_lines: bool = True,
+    arr: bool = True,
+    deferred: bool = True,
+    periods=None,
+    interval_str: INTERVAL = "Month",
+    generalize_leap_year: bool = True,
+    granularity: GRANULARITY = "Month",
+) -> pd.DataFrame:
+    """Long, compact form of `annualize_df`, only the cells that exist.
 
-    df[annualize_name] = df.apply(
-        lambda row: annualize(
-            ContractLine(
-                row[f"line.amount"],
-                row[f"{col_name}.start_date"].date(),
-                row[f"{col_name}.end_date"].date(),
-                row["line.product"],
-                row["line.renewable"],
+    `customer` & `line.product` are categoricals, `period` is an int32
+    code (see `period_codes`) and the value is in integer cents, `ARR.cents` | `ACV.cents`. Every line is rounded
+    to cents once, sums of cents don't drift like floats do.
+
+    Args:
+        df (pd.DataFrame): Contracts in the `Contract.to_df` layout.
+        by_lines (bool): Use the line dates if `True`, else the header dates.
+        arr (bool): Only keep renewable lines & name the value `ARR.cents`,
+            otherwise keep everything & name it `ACV.cents`.
+        deferred (bool): Include deferred periods.
+        periods (array-like): Periods to build. Defaults to
+            `get_periods(df, granularity)`.
+        interval_str (INTERVAL): See `annualize`.
+        generalize_leap_year (bool): See `annualize`.
+        granularity (GRANULARITY): "Day", "Month", "Quarter" or "Year"
+            periods, see `get_calendar`.
+
+    Returns:
+        pd.DataFrame: `period`, `customer`, `id`, `line.product` & the
+            value, one row per cell, sorted by the first four.
+            `compact_to_wide` with the same `granularity` turns it into
+            the `annualize_df` layout.
+    """
+    if periods is None:
+        periods = get_periods(df, granularity)
+    periods = np.asarray(periods, dtype="datetime64[D]")
+
+    if arr:
+        df = df[df["line.renewable"] == True]
+
+    value_name = "ARR.cents" if arr else "ACV.cents"
+    cols = ["period", "customer", "id", "line.product"]
+
+    # 1
+    amount, scale = annualize_lines(
+        df, periods, by_lines, interval_str, generalize_leap_year
+    )
+    with stage("expand_periods", len(df)) as s:
+        line_idx, period_idx = expand_periods(df, periods, by_lines, deferred)
+        s.rows_out = len(line_idx)
+    amount = amount[line_idx]
+    if scale is not None:
+        amount = amount * scale[period_idx]
+
+    # 2
+    customer_codes, customers = pd.factorize(df["customer"], sort=True)
+    product_codes, products = pd.factorize(df["line.product"], sort=True)
+    cells = pd.DataFrame(
+        {
+            "period": period_codes(periods, granularity)[period_idx],
+            "customer": pd.Categorical.from_codes(customer_codes[line_idx], customers),
+            "id": df["id"].to_numpy()[line_idx],
+            "line.product": pd.Categorical.from_codes(
+                product_codes[line_idx], products
             ),
-            row["period"].date(),
-            "Month",
-            True,
-            False,
-        ),
-        axis=1,
+            value_name: np.rint(amount * 100).astype(np.int64),
+        }
     )
 
-    cols = ["period", "customer", "id", "line.product"]
+    with stage("groupby", len(cells)) as s:
+        df = cells.groupby(cols, observed=True)[value_name].sum().reset_index()
+        s.rows_out = len(df)
+
+    return df
+
+
+def compact_to_wide(df: pd.DataFrame, granularity: GRANULARITY) -> pd.DataFrame:
+    """Turn `annualize_compact_df` output back into the `annualize_df` layout.
+
+    The period codes don't say what they count, so `granularity` has to be
+    the one the compact frame was built with.
+
+    Args:
+        df (pd.DataFrame): Output of `annualize_compact_df`.
+        granularity (GRANULARITY): See `annualize_compact_df`.
+
+    Returns:
+        pd.DataFrame: Same as `annualize_df`, values rounded to cents.
+    """
+    value_name = "ARR.cents" if "ARR.cents" in df.columns else "ACV.cents"
+    cells = pd.DataFrame(
+        {
+            "period": period_dates(df["period"], granularity).astype("datetime64[ns]"),
+            "customer": np.asarray(df["customer"]),
+            "id": df["id"].to_numpy(),
+            "line.product": np.asarray(df["line.product"]),
+            value_name.split(".")[0]: df[value_name].to_numpy() / 100,
+        }
+    )
+    cells["customer"] = cells["customer"].astype(df["customer"].cat.categories.dtype)
+    cells["line.product"] = cells["line.product"].astype(
+        df["line.product"].cat.categories.dtype
+    )
+    df = cells.set_index(["period", "customer", "id", "line.product"])
+    return df.unstack(level=0).fillna(0)
+
+
+def rollup_codes(df: pd.DataFrame, rollup: str | list[str]) -> tuple:
+    """Group code of every line & the group labels, see `annualize_rollup_df`."""
+    if rollup == "total":
+        return np.zeros(len(df), dtype=np.int64), pd.Index(["Total"])
+    if isinstance(rollup, str):
+        codes, index = pd.factorize(df[rollup], sort=True)
+        return codes, pd.Index(index, name=rollup)
+    codes, index = pd.factorize(pd.MultiIndex.from_frame(df[rollup]), sort=True)
+    return codes, index.set_names(rollup)
+
+
+def rollup_matrix(
+    df: pd.DataFrame,
+    codes: np.ndarray,
+    groups: int,
+    periods: np.ndarray,
+    by_lines: bool = True,
+    deferred: bool = True,
+    interval_str: INTERVAL = "Month",
+    generalize_leap_year: bool = True,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Sum every line's deferred & active windows into (group, period) cells.
+
+    A line adds its amount at the first period of a window and takes it
+    off after the last one. Those events are counted per (group, period)
+    with `bincount` and cumulative summed over the periods.
+
+    Args:
+        df (pd.DataFrame): Contracts in the `Contract.to_df` layout.
+        codes (ndarray): Group of every line, from 0 to `groups` - 1.
+        groups (int): Number of groups.
+        periods (ndarray): Sorted `datetime64[D]` periods.
+        by_lines (bool): Use the line dates if `True`, else the header dates.
+        deferred (bool): Include deferred periods.
+        interval_str (INTERVAL): See `annualize`.
+        generalize_leap_year (bool): See `annualize`.
+
+    Returns:
+        tuple[ndarray, ndarray]: (groups, periods) matrices of the
+            annualized amount & the number of lines in every cell.
+    """
+    # 1
+    amount, scale = annualize_lines(
+        df, periods, by_lines, interval_str, generalize_leap_year
+    )
+    deferred_count, active_start, active_count = period_windows(
+        df, periods, by_lines, deferred
+    )
+    window_start = np.concatenate([np.zeros(len(df), dtype=np.int64), active_start])
+    window_count = np.concatenate([deferred_count, active_count])
+    has_window = window_count > 0
+    window_start, window_stop = (
+        window_start[has_window],
+        (window_start + window_count)[has_window],
+    )
+    group = np.concatenate([codes, codes])[has_window]
+    amount = np.concatenate([amount, amount])[has_window]
+
+    # 2
+    with stage("cumsum", len(group)) as s:
+        width = len(periods) + 1
+        size = groups * width
+        events = np.concatenate(
+            [group * width + window_start, group * width + window_stop]
+        )
+        values = np.bincount(events, np.r_[amount, -amount], size).reshape(-1, width)
+        ones = np.ones(len(group))
+        cells = np.bincount(events, np.r_[ones, -ones], size)
+        values = np.cumsum(values, axis=1)[:, :-1]
+        if scale is not None:
+            values *= scale
+        cells = np.cumsum(cells.reshape(-1, width), axis=1)[:, :-1]
+        values[cells == 0] = 0
+        s.rows_out = groups
+
+    return values, cells
+
+
+def annualize_rollup_df(
+    df,
+    rollup: str | list[str],
+    by_lines: bool = True,
+    arr: bool = True,
+    deferred: bool = True,
+    periods=None,
+    interval_str: INTERVAL = "Month",
+    generalize_leap_year: bool = True,
+    granularity: GRANULARITY = "Month",
+) -> pd.DataFrame:
+    """`annualize_df` rolled up to `rollup`, without building the cube.
+
+    Lines are summed straight into (group, period) cells by
+    `rollup_matrix`, so it's O(lines + groups * periods) instead of
+    O(lines * periods).
+
+    Same values as `annualize_df(df).groupby(level=rollup).sum()`, groups
+    and periods without any cell are left out the same way.
+
+    Args:
+        df (pd.DataFrame): Contracts in the `Contract.to_df` layout.
+        rollup (str | list[str]): `"total"` or index level(s) of the cube to
+            roll up to, e.g. `"customer"`, `"line.product"`.
+        by_lines (bool): Use the line dates if `True`, else the header dates.
+        arr (bool): Only keep renewable lines & name the value `ARR`,
+            otherwise keep everything & name it `ACV`.
+        deferred (bool): Include deferred periods.
+        periods (array-like): Periods to build. Defaults to
+            `get_periods(df, granularity)`.
+        interval_str (INTERVAL): See `annualize`.
+        generalize_leap_year (bool): See `annualize`.
+        granularity (GRANULARITY): "Day", "Month", "Quarter" or "Year"
+            periods, see `get_calendar`.
+
+    Returns:
+        pd.DataFrame: Indexed by `rollup` (a single `Total` row for
+            `"total"`), with a (`ARR` | `ACV`, period) column per period.
+    """
+    if periods is None:
+        periods = get_periods(df, granularity)
+    periods = np.asarray(periods, dtype="datetime64[D]")
 
     if arr:
         df = df[df["line.renewable"] == True]
 
-    if deferred:
-        df = df[(df["active"] == True) | (df["deferred"] == True)]
-    else:
-        df = df[df["active"] == True]
+    annualize_name = "ARR" if arr else "ACV"
+
+    codes, index = rollup_codes(df, rollup)
+    values, cells = rollup_matrix(
+        df,
+        codes,
+        len(index),
+        periods,
+        by_lines,
+        deferred,
+        interval_str,
+        generalize_leap_year,
+    )
+
+    keep_rows, keep_cols = cells.any(axis=1), cells.any(axis=0)
+    return pd.DataFrame(
+        values[np.ix_(keep_rows, keep_cols)],
+        index=index[keep_rows],
+        columns=pd.MultiIndex.from_product(
+            [[annualize_name], periods[keep_cols].astype("datetime64[ns]")],
+            names=[None, "period"],
+        ),
+    )
+
+
+def partition_by_customer(df: pd.DataFrame, partitions: int) -> list[pd.DataFrame]:
+    """Split a contract DataFrame into partitions by a hash of `customer`.
+
+    Every line of a customer lands in the same partition, so each
+    partition can be annualized on its own.
 
-    df = pd.DataFrame(df[cols + [annualize_name]].groupby(cols).sum()).unstack(
+    Args:
+        df (pd.DataFrame): Contracts in the `Contract.to_df` layout.
+        partitions (int): Number of partitions.
+
+    Returns:
+        list[pd.DataFrame]: Non-empty partitions, in partition order.
+    """
+    customer = df["customer"].astype(str).to_numpy()
+    bucket = pd.util.hash_array(customer) % partitions
+    return [df[bucket == i] for i in range(partitions) if (bucket == i).any()]
+
+
+def _annualize_partition(args: tuple) -> pd.DataFrame:
+    df, periods, by_lines, arr, deferred, options = args
+    return annualize_long_df(df, by_lines, arr, deferred, periods, **options).unstack(
         level=0
     )
 
-    df.fillna(0, inplace=True)
 
-    return df
\ No newline at end of file
+def annualize_df(
+    df,
+    by_lines: bool = True,
+    arr: bool = True,
+    deferred: bool = True,
+    workers: int = 1,
+    rollup: str | list[str] = None,
+    compact: bool = False,
+    interval_str: INTERVAL = "Month",
+    generalize_leap_year: bool = True,
+    granularity: GRANULARITY = "Month",
+) -> pd.DataFrame:
+    """Annualize a contract DataFrame into the customer cube.
+
+    Only the (line, period) pairs inside a line's active or deferred
+    window are built, see `expand_periods`.
+
+    Args:
+        df (pd.DataFrame): Contracts in the `Contract.to_df` layout.
+        by_lines (bool): Use the line dates if `True`, else the header dates.
+        arr (bool): Only keep renewable lines & name the value `ARR`,
+            otherwise keep everything & name it `ACV`.
+        deferred (bool): Include deferred periods.
+        workers (int): Number of processes. Above 1 the contracts are
+            split with `partition_by_customer` and each partition is
+            annualized in a `ProcessPoolExecutor`. Same output either way.
+        rollup (str | list[str]): Optional `"total"`, `"customer"`,
+            `"line.product"` (or a list of index levels) to only build
+            that rollup of the cube, see `annualize_rollup_df`.
+            `workers` is ignored then.
+        compact (bool): Return the long, compact layout of
+            `annualize_compact_df` instead. `workers` is ignored then.
+        interval_str (INTERVAL): See `annualize`.
+        generalize_leap_year (bool): See `annualize`.
+        granularity (GRANULARITY): "Day", "Month", "Quarter" or "Year"
+            periods, see `get_calendar`.
+
+    Returns:
+        pd.DataFrame: Indexed by (customer, id, line.product), or by
+            `rollup`, with a (`ARR` | `ACV`, period) column for every period.
+    """
+    options = dict(
+        interval_str=interval_str,
+        generalize_leap_year=generalize_leap_year,
+        granularity=granularity,
+    )
+    if rollup is not None:
+        return annualize_rollup_df(df, rollup, by_lines, arr, deferred, **options)
+    if compact:
+        return annualize_compact_df(df, by_lines, arr, deferred, **options)
+
+    if workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        periods = get_periods(df, granularity)
+        with stage("partition", len(df)) as s:
+            tasks = [
+                (partition, periods, by_lines, arr, deferred, options)
+                for partition in partition_by_customer(df, workers)
+            ]
+            s.rows_out = len(tasks)
+        with stage("pool", len(df)) as s:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                df = pd.concat(pool.map(_annualize_partition, tasks))
+            df = df.sort_index().sort_index(axis=1)
+            s.rows_out = len(df)
+    else:
+        df = annualize_long_df(df, by_lines, arr, deferred, **options)
+        with stage("unstack", len(df)) as s:
+            df = df.unstack(level=0)
+            s.rows_out = len(df)
+
+    with stage("fillna", len(df)) as s:
+        df.fillna(0, inplace=True)
+        s.rows_out = len(df)
+
+    return df
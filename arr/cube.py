@@ -0,0 +1,176 @@
+from __future__ import annotations
+from .contract import Contract, annualize_long_df, contracts_to_df, get_periods
+from .instrument import stage
+
+from typing import Iterable, Union
+
+import numpy as np
+import pandas as pd
+
+
+ContractInput = Union[Contract, Iterable[Contract], pd.DataFrame]
+
+
+def _to_contract_df(contracts: ContractInput) -> pd.DataFrame:
+    """Turn a `Contract`, an iterable of them or a DataFrame slice into a DataFrame."""
+    if isinstance(contracts, pd.DataFrame):
+        return contracts
+    if isinstance(contracts, Contract):
+        contracts = [contracts]
+    return contracts_to_df(contracts)
+
+
+def _to_ids(contracts) -> np.ndarray:
+    """Contract ids of a `Contract`, DataFrame, single id or iterable of either."""
+    if isinstance(contracts, pd.DataFrame):
+        return contracts["id"].unique()
+    if isinstance(contracts, Contract):
+        return np.array([contracts.id])
+    if np.isscalar(contracts):
+        return np.array([contracts])
+    return np.array(
+        [
+            contract.id if isinstance(contract, Contract) else contract
+            for contract in contracts
+        ]
+    )
+
+
+class CustomerCube:
+    """Holds the output of `annualize_df` and keeps it current as contracts change.
+
+    Only the contracts that were upserted or deleted get annualized
+    again, their rows are dropped from the cube and the new ones are
+    spliced in. A count of cells per period tells which period columns
+    are still in use. When the period axis grows, the rest of the book
+    is only built for the new periods.
+
+    Args:
+        contracts (pd.DataFrame): Contracts in the `Contract.to_df` layout.
+        by_lines (bool): See `annualize_df`.
+        arr (bool): See `annualize_df`.
+        deferred (bool): See `annualize_df`.
+
+    Example:
+        cube = CustomerCube(CONTRACTS)
+        cube.upsert(amended_contract)
+        cube.delete([121, 122])
+        cube.df  # same as `annualize_df` on the updated contracts
+    """
+
+    def __init__(
+        self,
+        contracts: pd.DataFrame,
+        by_lines: bool = True,
+        arr: bool = True,
+        deferred: bool = True,
+    ):
+        self.by_lines = by_lines
+        self.arr = arr
+        self.deferred = deferred
+        self.name = "ARR" if arr else "ACV"
+        self.contracts = contracts.reset_index(drop=True)
+        self.periods = self._periods(self.contracts)
+        self.df, self._counts = self._build(self.contracts, self.periods)
+
+    @staticmethod
+    def _periods(contracts: pd.DataFrame) -> np.ndarray:
+        if contracts.empty:
+            return np.array([], dtype="datetime64[D]")
+        return get_periods(contracts)
+
+    def _build(self, contracts: pd.DataFrame, periods: np.ndarray) -> tuple:
+        """Wide cube of `contracts` over `periods` & its cells per period."""
+        if contracts.empty or not len(periods):
+            df = pd.DataFrame(
+                index=pd.MultiIndex.from_arrays(
+                    [[], [], []], names=["customer", "id", "line.product"]
+                ),
+                columns=pd.MultiIndex.from_arrays(
+                    [[], pd.DatetimeIndex([])], names=[None, "period"]
+                ),
+                dtype=float,
+            )
+            return df, pd.Series(0, index=pd.DatetimeIndex([], name="period"))
+
+        cells = annualize_long_df(
+            contracts, self.by_lines, self.arr, self.deferred, periods
+        )
+        counts = cells.groupby(level="period").size()
+        with stage("unstack", len(cells)) as s:
+            df = cells.unstack(level=0).fillna(0)
+            s.rows_out = len(df)
+        return df, counts
+
+    def upsert(self, contracts: ContractInput) -> CustomerCube:
+        """Add new contracts or replace existing ones with the same `id`.
+
+        Args:
+            contracts (Contract | Iterable[Contract] | pd.DataFrame): Every
+                line of each contract being added or amended.
+
+        Returns:
+            CustomerCube: self, updated in place.
+        """
+        contracts = _to_contract_df(contracts)
+        return self._update(contracts["id"].unique(), contracts)
+
+    def delete(self, contracts) -> CustomerCube:
+        """Remove (cancel) contracts from the cube.
+
+        Args:
+            contracts: Contract ids, `Contract` objects or a DataFrame slice.
+
+        Returns:
+            CustomerCube: self, updated in place.
+        """
+        return self._update(_to_ids(contracts), None)
+
+    def _update(self, ids: np.ndarray, new_contracts: pd.DataFrame | None):
+        # 1
+        changed = self.contracts["id"].isin(ids)
+        unchanged = self.contracts[~changed]
+        contracts = (
+            unchanged
+            if new_contracts is None
+            else pd.concat([unchanged, new_contracts], ignore_index=True)
+        )
+        periods = self._periods(contracts)
+        added = np.setdiff1d(periods, self.periods)
+        removed = np.setdiff1d(self.periods, periods).astype("datetime64[ns]")
+
+        # 2
+        old, old_counts = self._build(self.contracts[changed], self.periods)
+        new, new_counts = self._build(
+            new_contracts if new_contracts is not None else contracts.iloc[:0],
+            periods,
+        )
+        grown, grown_counts = self._build(unchanged, added)
+        counts = (
+            self._counts.sub(old_counts, fill_value=0)
+            .add(new_counts, fill_value=0)
+            .add(grown_counts, fill_value=0)
+            .drop(removed, errors="ignore")
+        )
+        counts = counts[counts > 0].sort_index()
+
+        # 3
+        with stage("merge", len(new)) as s:
+            columns = pd.MultiIndex.from_product(
+                [[self.name], counts.index], names=[None, "period"]
+            )
+            df = self.df[~self.df.index.get_level_values("id").isin(ids)]
+            if len(grown.columns):
+                df = pd.concat([df, grown], axis=1).fillna(0)
+            df = df.reindex(columns=columns, fill_value=0)
+            if len(new):
+                new = new.reindex(columns=columns, fill_value=0)
+                df = pd.concat([df, new]).sort_index()
+            self.df = df
+            s.rows_out = len(new)
+
+        self.contracts = contracts
+        self.periods = periods
+        self._counts = counts
+
+        return self
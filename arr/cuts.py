@@ -1,5 +1,227 @@
+from .annualize import annualize_array, get_end_of_month_range
+
+import numpy as np
 import pandas as pd
 
-def up_for_renewal_df(df: pd.DataFrame) -> pd.DataFrame:
-    
-    return df
\ No newline at end of file
+CUTS = [
+    "New Customer",
+    "X-Sale",
+    "Expansion",
+    "Product Downgrade",
+    "Product Churn",
+    "Customer Churn",
+]
+
+
+def _customer_product_matrix(df: pd.DataFrame) -> pd.DataFrame:
+    """Sum the cube to (customer, line.product) rows over every month end.
+
+    Raises:
+        ValueError: The cube isn't monthly, e.g. `granularity="Quarter"`.
+            Filling its gaps with month ends would make up churn.
+    """
+    name = df.columns.get_level_values(0)[0]
+    df = df[name].groupby(level=["customer", "line.product"]).sum()
+    periods = df.columns
+
+    days = periods.to_numpy("datetime64[D]")
+    months = days.astype("datetime64[M]")
+    month_ends = (months + 1).astype("datetime64[D]") - np.timedelta64(1, "D")
+    steps = np.diff(months.astype(np.int64))
+    if (month_ends != days).any() or (len(steps) and np.gcd.reduce(steps) > 1):
+        raise ValueError(
+            "Movements & retention need a monthly cube, "
+            'build it with granularity="Month"'
+        )
+    months = get_end_of_month_range(
+        periods[0].date().replace(day=1), periods[-1].date()
+    )
+    return df.reindex(columns=pd.DatetimeIndex(months, name="period"), fill_value=0)
+
+
+def _check_months(months: int):
+    if months < 1:
+        raise ValueError(f"months must be at least 1, got {months}")
+
+
+def classify_movements(df: pd.DataFrame, months: int = 1) -> pd.DataFrame:
+    """Classify every customer/product ARR movement from period `a` to `b`.
+
+    `a` is `months` month ends before `b`, 1 for consecutive periods,
+    12 for year over year. Works on the whole cube at once: `a` is every
+    column but the last `months`, `b` every column but the first
+    `months`, customer totals come from one groupby.
+
+    Rules, per (customer, line.product) going from `a` to `b`:
+        New Customer: customer had no ARR in `a`.
+        Customer Churn: customer has no ARR in `b`.
+        X-Sale: product new to an existing customer.
+        Product Churn: product dropped by a remaining customer.
+        Expansion / Product Downgrade: product ARR went up / down.
+
+    Args:
+        df (pd.DataFrame): Output of `annualize_df`.
+        months (int): Months between `a` & `b`.
+
+    Returns:
+        pd.DataFrame: `cut` & `value` (change in ARR) of every movement,
+            indexed by (customer, line.product, period) where `period` is `b`.
+            Empty if `months` spans the whole cube.
+
+    Raises:
+        ValueError: `months` is below 1.
+    """
+    # 1
+    _check_months(months)
+    matrix = _customer_product_matrix(df)
+    values = matrix.to_numpy()
+    stop = max(values.shape[1] - months, 0)
+    customer_codes = matrix.index.codes[0]
+    customer_totals = np.zeros((len(matrix.index.levels[0]), values.shape[1]))
+    np.add.at(customer_totals, customer_codes, values)
+    customer_totals = customer_totals[customer_codes]
+
+    # 2
+    a, b = values[:, :stop], values[:, months:]
+    customer_a = customer_totals[:, :stop] > 0
+    customer_b = customer_totals[:, months:] > 0
+    existing = customer_a & customer_b
+
+    # 3
+    cuts = np.full(a.shape, -1)
+    cuts[~customer_a & customer_b & (b > 0)] = CUTS.index("New Customer")
+    cuts[existing & (a == 0) & (b > 0)] = CUTS.index("X-Sale")
+    cuts[existing & (a > 0) & (b > a)] = CUTS.index("Expansion")
+    cuts[existing & (b > 0) & (b < a)] = CUTS.index("Product Downgrade")
+    cuts[existing & (a > 0) & (b == 0)] = CUTS.index("Product Churn")
+    cuts[customer_a & ~customer_b & (a > 0)] = CUTS.index("Customer Churn")
+
+    # 4
+    rows, cols = np.nonzero(cuts >= 0)
+    return pd.DataFrame(
+        {
+            "cut": pd.Categorical.from_codes(cuts[rows, cols], CUTS),
+            "value": b[rows, cols] - a[rows, cols],
+        },
+        index=pd.MultiIndex.from_arrays(
+            [
+                matrix.index.get_level_values("customer")[rows],
+                matrix.index.get_level_values("line.product")[rows],
+                matrix.columns[months:][cols],
+            ],
+            names=["customer", "line.product", "period"],
+        ),
+    )
+
+
+def arr_bridge_df(df: pd.DataFrame, by: str = None, months: int = 1) -> pd.DataFrame:
+    """ARR bridge (waterfall) from every period to the one `months` later.
+
+    `ARR` + every cut = `Ending ARR`. A 12 month bridge classifies each
+    movement once over the year, it isn't the sum of 12 monthly bridges.
+
+    Args:
+        df (pd.DataFrame): Output of `annualize_df`.
+        by (str): Optional `customer` or `line.product` to get a bridge per segment.
+        months (int): Months between the starting & ending period.
+
+    Returns:
+        pd.DataFrame: Columns `ARR`, the `CUTS` and `Ending ARR`, indexed
+            by the ending period (and `by`). Empty if `months` spans the
+            whole cube.
+
+    Raises:
+        ValueError: `months` is below 1.
+    """
+    # 1
+    _check_months(months)
+    matrix = _customer_product_matrix(df)
+    totals = matrix.groupby(level=by).sum() if by else matrix.sum().to_frame().T
+    stop = max(totals.shape[1] - months, 0)
+    starting = totals.iloc[:, :stop].set_axis(totals.columns[months:], axis=1)
+    balances = pd.DataFrame(
+        {"ARR": starting.stack(), "Ending ARR": totals.iloc[:, months:].stack()}
+    )
+    if by is None:
+        balances = balances.droplevel(0)
+
+    # 2
+    keys = [by, "period"] if by else ["period"]
+    cuts = (
+        classify_movements(df, months)
+        .groupby(keys + ["cut"], observed=False)["value"]
+        .sum()
+        .unstack("cut")
+    )
+    cuts.columns = list(cuts.columns)
+
+    bridge = balances.join(cuts).fillna(0)
+    columns = ["ARR"] + CUTS + ["Ending ARR"]
+    return bridge.reindex(columns=columns, fill_value=0).astype(float)
+
+
+def up_for_renewal_df(df: pd.DataFrame, by_lines: bool = True) -> pd.DataFrame:
+    """ARR up for renewal, per period, in the same layout as `annualize_df`.
+
+    A renewable line is up for renewal in the month end period its
+    `end_date` falls in, for the ARR it carries. Lines are sorted by
+    `end_date` once and every period's slice of them is found with
+    `searchsorted`, instead of scanning the cube for each period.
+
+    Args:
+        df (pd.DataFrame): Contracts in the `Contract.to_df` layout.
+        by_lines (bool): Use the line dates if `True`, else the header dates.
+
+    Returns:
+        pd.DataFrame: Indexed by (customer, id, line.product), with
+            an (`ARR`, period) column for every period with a renewal.
+    """
+    # 1
+    df = df[df["line.renewable"] == True]
+    cols = ["period", "customer", "id", "line.product"]
+    if df.empty:
+        return pd.DataFrame(
+            index=pd.MultiIndex.from_frame(df[cols[1:]]),
+            columns=pd.MultiIndex.from_arrays(
+                [
+                    pd.Index([], dtype="str"),
+                    pd.DatetimeIndex([], dtype="datetime64[ns]"),
+                ],
+                names=[None, "period"],
+            ),
+        )
+    col_name = "line" if by_lines else "header"
+    start_date = df[f"{col_name}.start_date"].to_numpy("datetime64[D]")
+    end_date = df[f"{col_name}.end_date"].to_numpy("datetime64[D]")
+    # every month an end date falls in, `get_periods` can miss the last one
+    months = np.arange(
+        end_date.min().astype("datetime64[M]"),
+        end_date.max().astype("datetime64[M]") + 1,
+    )
+    periods = (months + 1).astype("datetime64[D]") - np.timedelta64(1, "D")
+
+    # 2
+    order = np.argsort(end_date, kind="stable")
+    first_day = periods[0].astype("datetime64[M]").astype("datetime64[D]")
+    edges = np.r_[first_day - np.timedelta64(1, "D"), periods]
+    bounds = np.searchsorted(end_date[order], edges, "right")
+    line_idx = order[bounds[0] : bounds[-1]]
+    period_idx = np.repeat(np.arange(len(periods)), np.diff(bounds))
+
+    # 3
+    amount = annualize_array(
+        df["line.amount"].to_numpy()[line_idx],
+        start_date[line_idx],
+        end_date[line_idx],
+        None,
+        "Month",
+        True,
+    )
+    cells = df[cols[1:]].iloc[line_idx].reset_index(drop=True)
+    cells.insert(0, "period", periods[period_idx].astype("datetime64[ns]"))
+    cells["ARR"] = amount
+
+    df = pd.DataFrame(cells.groupby(cols).sum()).unstack(level=0)
+    df.fillna(0, inplace=True)
+
+    return df
@@ -0,0 +1,291 @@
+from __future__ import annotations
+from .annualize import INTERVAL, get_contract_term_array
+from .assumptions import DOWNGRADE_CHANCE, EXPANSION_CHANCE, RENEWAL_CHANCE
+from .contract import annualize_lines, annualize_rollup_df
+from .instrument import stage
+from .periods import add_months
+from .renewal import link_renewals
+
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+EXPANSION_UPLIFT = 0.2
+DOWNGRADE_CUT = 0.2
+PERCENTILES = (5, 25, 50, 75, 95)
+BATCH_PATHS = 250
+
+
+def expiring_contracts(
+    df: pd.DataFrame,
+    as_of,
+    grace_days: int = 30,
+    by_lines: bool = True,
+    interval_str: INTERVAL = "Month",
+    generalize_leap_year: bool = True,
+) -> pd.DataFrame:
+    """Contracts known at `as_of` whose renewal is still open.
+
+    A contract is open if it was booked by `as_of`, none of its lines
+    has a booked renewal (see `link_renewals`) and it ends after
+    `as_of` less `grace_days`, so a renewal can still come in.
+
+    Args:
+        df (pd.DataFrame): Contracts in the `Contract.to_df` layout.
+        as_of (date): Date the book is known at.
+        grace_days (int): See `link_renewals`.
+        by_lines (bool): Use the line dates if `True`, else the header dates.
+        interval_str (INTERVAL): See `annualize`.
+        generalize_leap_year (bool): See `annualize`.
+
+    Returns:
+        pd.DataFrame: Indexed by `id`, with `customer`, `ARR` (of the
+            renewable lines still running at the end of the contract),
+            `end_date` & `term` in months.
+    """
+    as_of = np.datetime64(as_of, "D")
+    col_name = "line" if by_lines else "header"
+
+    # 1
+    df = df[df["header.booking_date"].to_numpy("datetime64[D]") <= as_of]
+    df = link_renewals(df, grace_days, by_lines)
+    amount, _ = annualize_lines(df, as_of, by_lines, interval_str, generalize_leap_year)
+    start_date = df[f"{col_name}.start_date"].to_numpy("datetime64[D]")
+    end_date = df[f"{col_name}.end_date"].to_numpy("datetime64[D]")
+
+    # 2
+    id_codes, ids = pd.factorize(df["id"])
+    contract_start = np.full(len(ids), np.iinfo(np.int64).max)
+    np.minimum.at(contract_start, id_codes, start_date.astype(np.int64))
+    contract_end = np.full(len(ids), np.iinfo(np.int64).min)
+    np.maximum.at(contract_end, id_codes, end_date.astype(np.int64))
+    exit_line = (end_date.astype(np.int64) == contract_end[id_codes]) & (
+        df["line.renewable"] == True
+    ).to_numpy()
+    exit_arr = np.bincount(id_codes, np.where(exit_line, amount, 0), len(ids))
+    renewed = np.bincount(
+        id_codes, df["line.successor_id"].notna().to_numpy(), len(ids)
+    )
+
+    # 3
+    contract_start = contract_start.astype("datetime64[D]")
+    contract_end = contract_end.astype("datetime64[D]")
+    term = get_contract_term_array(contract_start, contract_end, True, "Month")
+    customer = np.zeros(len(ids), dtype=object)
+    customer[id_codes] = df["customer"].to_numpy()
+    expiring = pd.DataFrame(
+        {
+            "customer": customer,
+            "ARR": exit_arr,
+            "end_date": contract_end.astype("datetime64[ns]"),
+            "term": np.maximum(term, 1),
+        },
+        index=pd.Index(ids, name="id"),
+    )
+    is_open = (
+        (renewed == 0)
+        & (exit_arr > 0)
+        & (contract_end >= as_of - np.timedelta64(grace_days, "D"))
+    )
+    return expiring[is_open]
+
+
+def _simulate_batch(args) -> np.ndarray:
+    """ARR from renewals per path & period for one batch of paths.
+
+    Every path is drawn for all open contracts at once, one renewal
+    cycle at a time until every contract has churned or runs past the
+    last period.
+    """
+    arr, end_date, term, periods, paths, seed, chances = args
+    renewal, expansion, downgrade, uplift, cut = chances
+    rng = np.random.default_rng(seed)
+    width = len(periods) + 1
+    events = np.zeros((paths, width))
+
+    for path in range(paths):
+        value, end, months = arr, end_date, term
+        while len(value):
+            draws = rng.random((3, len(value)))
+            factor = 1 + uplift * (draws[1] < expansion) - cut * (draws[2] < downgrade)
+            renews = draws[0] < renewal
+            value, months = (value * factor)[renews], months[renews]
+            start = end[renews] + np.timedelta64(1, "D")
+            end = add_months(start, months) - np.timedelta64(1, "D")
+
+            first = np.searchsorted(periods, start, "left")
+            stop = np.searchsorted(periods, end, "right")
+            events[path] += np.bincount(first, value, width)
+            events[path] -= np.bincount(stop, value, width)
+
+            running = end < periods[-1]
+            value, end, months = value[running], end[running], months[running]
+
+    return np.cumsum(events, axis=1)[:, :-1]
+
+
+def simulate_arr_paths(
+    df: pd.DataFrame,
+    as_of=None,
+    months: int = 36,
+    paths: int = 10_000,
+    seed: int = None,
+    workers: int = 1,
+    renewal_chance: float = RENEWAL_CHANCE,
+    expansion_chance: float = EXPANSION_CHANCE,
+    downgrade_chance: float = DOWNGRADE_CHANCE,
+    expansion_uplift: float = EXPANSION_UPLIFT,
+    downgrade_cut: float = DOWNGRADE_CUT,
+    grace_days: int = 30,
+    by_lines: bool = True,
+    deferred: bool = True,
+    interval_str: INTERVAL = "Month",
+    generalize_leap_year: bool = True,
+) -> pd.DataFrame:
+    """Simulate the renewals of the open contracts, total ARR per path.
+
+    ARR per period is the contracted ARR of the book as known at
+    `as_of` (`annualize_rollup_df`) plus the renewals of a path. When
+    a contract ends it renews for the same term with `renewal_chance`,
+    its ARR goes up by `expansion_uplift` with `expansion_chance` and
+    down by `downgrade_cut` with `downgrade_chance`, like
+    `data.build_contracts.generate_contracts` draws its book. A
+    renewal can renew again before the last period.
+
+    Paths are drawn in batches of `BATCH_PATHS`, each with its own
+    stream spawned from `np.random.SeedSequence(seed)`. With `workers`
+    above 1 the batches run in a `ProcessPoolExecutor`, a seed gives
+    the same paths whatever the number of workers.
+
+    Args:
+        df (pd.DataFrame): Contracts in the `Contract.to_df` layout.
+        as_of (date): Date the book is known at. Defaults to the latest
+            `header.booking_date`.
+        months (int): Number of month ends after `as_of` to forecast.
+        paths (int): Number of paths.
+        seed (int): Seed of the paths, `None` for a random one.
+        workers (int): Number of processes.
+        renewal_chance (float): Chance a contract renews.
+        expansion_chance (float): Chance a renewal expands.
+        downgrade_chance (float): Chance a renewal downgrades.
+        expansion_uplift (float): Share of ARR an expansion adds.
+        downgrade_cut (float): Share of ARR a downgrade takes off.
+        grace_days (int): See `expiring_contracts`.
+        by_lines (bool): Use the line dates if `True`, else the header dates.
+        deferred (bool): Include deferred periods of the booked contracts.
+        interval_str (INTERVAL): See `annualize`.
+        generalize_leap_year (bool): See `annualize`.
+
+    Returns:
+        pd.DataFrame: Indexed by `path`, with a (`ARR`, period) column per
+            month end.
+
+    Raises:
+        ValueError: `paths` or `months` is below 1.
+    """
+    if paths < 1:
+        raise ValueError(f"paths must be at least 1, got {paths}")
+    if months < 1:
+        raise ValueError(f"months must be at least 1, got {months}")
+    if as_of is None:
+        as_of = df["header.booking_date"].max()
+    as_of = np.datetime64(pd.Timestamp(as_of).date(), "D")
+    month_ends = (as_of.astype("datetime64[M]") + np.arange(1, months + 2)).astype(
+        "datetime64[D]"
+    ) - np.timedelta64(1, "D")
+    periods = month_ends[month_ends > as_of][:months]
+    options = dict(
+        by_lines=by_lines,
+        interval_str=interval_str,
+        generalize_leap_year=generalize_leap_year,
+    )
+
+    # 1
+    with stage("contracted", len(df)) as s:
+        booked = df[df["header.booking_date"].to_numpy("datetime64[D]") <= as_of]
+        contracted = annualize_rollup_df(
+            booked, "total", deferred=deferred, periods=periods, **options
+        )
+        # a single zero row if nothing booked has ARR in the horizon
+        contracted = contracted.reindex(
+            index=pd.Index(["Total"]),
+            columns=pd.MultiIndex.from_product(
+                [["ARR"], periods.astype("datetime64[ns]")], names=[None, "period"]
+            ),
+            fill_value=0,
+        )
+        expiring = expiring_contracts(df, as_of, grace_days, **options)
+        s.rows_out = len(expiring)
+
+    # 2
+    with stage("simulate", paths * len(expiring)) as s:
+        sizes = np.diff(np.r_[np.arange(0, paths, BATCH_PATHS), paths])
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+        chances = (
+            renewal_chance,
+            expansion_chance,
+            downgrade_chance,
+            expansion_uplift,
+            downgrade_cut,
+        )
+        contracts = (
+            expiring["ARR"].to_numpy(float),
+            expiring["end_date"].to_numpy("datetime64[D]"),
+            expiring["term"].to_numpy(np.int64),
+        )
+        batches = [
+            (*contracts, periods, size, batch_seed, chances)
+            for size, batch_seed in zip(sizes, seeds)
+        ]
+        if workers > 1:
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                renewals = list(pool.map(_simulate_batch, batches))
+        else:
+            renewals = [_simulate_batch(batch) for batch in batches]
+        values = np.concatenate(renewals) + contracted.to_numpy()
+        s.rows_out = len(values)
+
+    return pd.DataFrame(
+        values,
+        index=pd.RangeIndex(paths, name="path"),
+        columns=contracted.columns,
+    )
+
+
+def forecast_arr_df(
+    df: pd.DataFrame,
+    as_of: date = None,
+    months: int = 36,
+    paths: int = 10_000,
+    percentiles=PERCENTILES,
+    **kwargs,
+) -> pd.DataFrame:
+    """Percentiles of the forward ARR per month end, see `simulate_arr_paths`.
+
+    Args:
+        df (pd.DataFrame): Contracts in the `Contract.to_df` layout.
+        as_of (date): See `simulate_arr_paths`.
+        months (int): Number of month ends after `as_of` to forecast.
+        paths (int): Number of paths.
+        percentiles (Sequence[float]): Percentiles to keep, 0 to 100.
+        **kwargs: Passed to `simulate_arr_paths`, e.g. `seed` & `workers`.
+
+    Returns:
+        pd.DataFrame: Indexed by `percentile`, with a (`ARR`, period)
+            column per month end.
+
+    Example:
+        forecast_arr_df(CONTRACTS, "2024-12-31", paths=1_000, seed=0, workers=4)
+    """
+    simulated = simulate_arr_paths(df, as_of, months, paths, **kwargs)
+    with stage("percentiles", len(simulated)) as s:
+        values = np.percentile(simulated.to_numpy(), percentiles, axis=0)
+        s.rows_out = len(values)
+    return pd.DataFrame(
+        values,
+        index=pd.Index(percentiles, name="percentile"),
+        columns=simulated.columns,
+    )
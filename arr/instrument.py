@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import time
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from typing import Callable, Iterator
+
+_current: ContextVar[Instrumentation | None] = ContextVar(
+    "arr_instrumentation", default=None
+)
+
+
+@dataclass
+class Stage:
+    """Figures of one stage of the annualization pipeline.
+
+    Args:
+        name (str): Stage, e.g. `expand_periods`.
+        rows_in (int): Rows going into the stage.
+        rows_out (int): Rows coming out of it.
+        seconds (float): Wall time.
+        peak_bytes (int): Peak memory allocated during the stage, on top
+            of what was in use when it started. `None` unless
+            `Instrumentation(memory=True)`.
+    """
+
+    name: str
+    rows_in: int = None
+    rows_out: int = None
+    seconds: float = None
+    peak_bytes: int = None
+
+
+class _NullStage:
+    """What `stage` hands out when nothing is listening, ignores everything."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class Instrumentation:
+    """Records a `Stage` for every pipeline step run inside the `with` block.
+
+    `annualize_df` and the other cube builders report their stages to
+    the innermost active `Instrumentation`. Outside of one, a stage is
+    a shared no-op object and nothing is timed or traced.
+
+    `callback` is called with each `Stage` as soon as it finishes, it
+    can raise to abort the build, e.g. when `expand_periods` emits more
+    cells than a node can hold.
+
+    Args:
+        callback (Callable[[Stage], None]): Optional, called per stage.
+        memory (bool): Trace peak memory with `tracemalloc`, slows things down.
+
+    Example:
+        with Instrumentation(callback=print, memory=True) as stats:
+            annualize_df(CONTRACTS)
+        stats.to_records()
+    """
+
+    def __init__(self, callback: Callable[[Stage], None] = None, memory: bool = False):
+        self.callback = callback
+        self.memory = memory
+        self.stages: list[Stage] = []
+
+    def __enter__(self) -> Instrumentation:
+        self._token = _current.set(self)
+        self._started_tracing = self.memory and not tracemalloc.is_tracing()
+        if self._started_tracing:
+            tracemalloc.start()
+        return self
+
+    def __exit__(self, *exc):
+        _current.reset(self._token)
+        if self._started_tracing:
+            tracemalloc.stop()
+        return False
+
+    @contextmanager
+    def _stage(self, name: str, rows_in: int = None) -> Iterator[Stage]:
+        stage = Stage(name, rows_in)
+        if self.memory:
+            in_use = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+
+        yield stage
+
+        stage.seconds = time.perf_counter() - start
+        if self.memory:
+            stage.peak_bytes = tracemalloc.get_traced_memory()[1] - in_use
+        self.stages.append(stage)
+        if self.callback is not None:
+            self.callback(stage)
+
+    def to_records(self) -> list[dict]:
+        """Stages as dicts, e.g. for `pd.DataFrame` or a metrics exporter."""
+        return [asdict(stage) for stage in self.stages]
+
+
+def stage(name: str, rows_in: int = None):
+    """Context manager timing one stage, set `rows_out` on what it yields.
+
+    Example:
+        with stage("expand_periods", len(df)) as s:
+            line_idx, period_idx = expand_periods(df, periods)
+            s.rows_out = len(line_idx)
+    """
+    instrumentation = _current.get()
+    if instrumentation is None:
+        return _NULL_STAGE
+    return instrumentation._stage(name, rows_in)
@@ -0,0 +1,129 @@
+from __future__ import annotations
+from ._lazy import np
+
+from dataclasses import dataclass
+from datetime import date
+from functools import lru_cache
+from typing import Literal
+
+GRANULARITY = Literal["Day", "Month", "Quarter", "Year"]
+STEP_MONTHS = {"Month": 1, "Quarter": 3, "Year": 12}
+
+
+@dataclass(frozen=True, eq=False)
+class Calendar:
+    """Period dimension of a cube, see `get_calendar`.
+
+    Arrays are read-only, the same instance is shared by every cube build.
+
+    Args:
+        start (date): First date of the range.
+        end (date): Last date of the range.
+        granularity (GRANULARITY): "Day", "Month", "Quarter" or "Year".
+        periods (ndarray): `datetime64[D]` last day of every period.
+        codes (ndarray): int32 code of every period. Days since 1970-01-01
+            for "Day", months since 1970-01 of the period's last month otherwise.
+        lengths (ndarray): Days in every period.
+        is_leap (ndarray): Whether the period ends in a leap year.
+    """
+
+    start: date
+    end: date
+    granularity: GRANULARITY
+    periods: np.ndarray
+    codes: np.ndarray
+    lengths: np.ndarray
+    is_leap: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.periods)
+
+
+def _month_steps(day: np.datetime64, months: np.ndarray) -> np.ndarray:
+    """Dates reached by repeatedly adding `relativedelta(months=...)` to `day`.
+
+    `months` is the running total of months added. Like the loop in
+    `get_end_of_month_range`, a day clamped to a short month stays clamped.
+    """
+    month = day.astype("datetime64[M]")
+    offset = (day - month.astype("datetime64[D]")).astype(np.int64)
+    target = month + months.astype("timedelta64[M]")
+    days_in_month = (
+        (target + 1).astype("datetime64[D]") - target.astype("datetime64[D]")
+    ).astype(np.int64)
+    offset = np.minimum.accumulate(np.minimum(offset, days_in_month - 1))
+    return target.astype("datetime64[D]") + offset
+
+
+def add_months(dates: np.ndarray, months: np.ndarray) -> np.ndarray:
+    """Vectorized `date + relativedelta(months=months)`.
+
+    The day is clamped to the end of the target month, like `relativedelta`.
+
+    Args:
+        dates (ndarray): `datetime64[D]` dates.
+        months (ndarray): Months to add to each date.
+
+    Returns:
+        ndarray: `datetime64[D]` dates.
+    """
+    month = dates.astype("datetime64[M]")
+    day = (dates - month.astype("datetime64[D]")).astype(np.int64)
+    target = month + np.asarray(months).astype("timedelta64[M]")
+    days_in_month = (
+        (target + 1).astype("datetime64[D]") - target.astype("datetime64[D]")
+    ).astype(np.int64)
+    return target.astype("datetime64[D]") + np.minimum(day, days_in_month - 1)
+
+
+def leap_year_flags(dates) -> np.ndarray:
+    """Whether each date falls in a leap year."""
+    years = np.asarray(dates, dtype="datetime64[Y]").astype(np.int64) + 1970
+    return (years % 4 == 0) & ((years % 100 != 0) | (years % 400 == 0))
+
+
+@lru_cache(maxsize=256)
+def get_calendar(
+    start: date, end: date, granularity: GRANULARITY = "Month"
+) -> Calendar:
+    """Periods between two dates, computed once per (start, end, granularity).
+
+    "Month" gives the same periods as `get_end_of_month_range`: step a
+    month at a time from `start` while the date is before `end` and
+    take the month end. "Quarter" & "Year" step 3 & 12 months and take
+    the quarter / year end. "Day" is every day from `start` to `end`.
+
+    Args:
+        start (date): First date.
+        end (date): Last date.
+        granularity (GRANULARITY): Size of a period.
+
+    Returns:
+        Calendar: Periods with their codes, lengths & leap year flags.
+    """
+    first, last = np.datetime64(start, "D"), np.datetime64(end, "D")
+
+    # 1
+    if granularity == "Day":
+        periods = np.arange(first, last + np.timedelta64(1, "D"))
+        codes = periods.astype(np.int64)
+        lengths = np.ones(len(periods), dtype=np.int64)
+    else:
+        step = STEP_MONTHS[granularity]
+        span = (last.astype("datetime64[M]") - first.astype("datetime64[M]")).astype(
+            np.int64
+        )
+        steps = _month_steps(first, np.arange(0, max(span, 0) + 1, step))
+        months = steps[steps < last].astype("datetime64[M]").astype(np.int64)
+        codes = np.unique(months - months % step + step - 1)
+        period_months = codes.astype("datetime64[M]")
+        periods = (period_months + 1).astype("datetime64[D]") - np.timedelta64(1, "D")
+        lengths = (
+            periods - (period_months - (step - 1)).astype("datetime64[D]")
+        ).astype(np.int64) + 1
+
+    # 2
+    arrays = [periods, codes.astype(np.int32), lengths, leap_year_flags(periods)]
+    for array in arrays:
+        array.flags.writeable = False
+    return Calendar(start, end, granularity, *arrays)
@@ -0,0 +1,129 @@
+from __future__ import annotations
+from ._lazy import np, pd
+from .annualize import annualize_array
+
+KEYS = {"customer": "customer", "product": "line.product", "contract": "id"}
+
+
+class ARRIndex:
+    """Point-in-time ARR (or ACV) lookups without building the cube.
+
+    Every line adds its annualized amount on the first day of its
+    active (and deferred) window and takes it off again the day after.
+    Per key those events are sorted by date with a running total, so
+    the value of a key on any date, month end or not, is one
+    `searchsorted`. Same rules as `annualize_df`. A running count of
+    open windows is kept next to the totals, so a key without any
+    open window is exactly 0, not float residue.
+
+    The events of each rollup (e.g. customer, customer & product, or
+    the whole book) are sorted once, on its first query.
+
+    Args:
+        df (pd.DataFrame): Contracts in the `Contract.to_df` layout.
+        by_lines (bool): Use the line dates if `True`, else the header dates.
+        arr (bool): Only keep renewable lines, otherwise keep everything.
+        deferred (bool): Include deferred periods.
+
+    Example:
+        index = ARRIndex(CONTRACTS)
+        index.query(date(2024, 3, 15), customer="Customer 1")
+        index.query(get_end_of_month_range(start, end), product="A")
+    """
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        by_lines: bool = True,
+        arr: bool = True,
+        deferred: bool = True,
+    ):
+        if arr:
+            df = df[df["line.renewable"] == True]
+        col_name = "line" if by_lines else "header"
+        self.name = "ARR" if arr else "ACV"
+
+        # 1
+        start_date = df[f"{col_name}.start_date"].to_numpy("datetime64[D]")
+        end_date = df[f"{col_name}.end_date"].to_numpy("datetime64[D]")
+        amount = annualize_array(
+            df["line.amount"].to_numpy(), start_date, end_date, None, "Month", True
+        )
+        rows = [np.arange(len(df))]
+        starts = [start_date]
+        stops = [end_date + np.timedelta64(1, "D")]
+
+        # 2
+        if deferred:
+            header_start_date = df["header.start_date"].to_numpy("datetime64[D]")
+            is_deferred = (
+                df["header.booking_date"].to_numpy("datetime64[D]") < header_start_date
+            ) & (df["line.start_date"].to_numpy("datetime64[D]") == header_start_date)
+            rows.append(np.flatnonzero(is_deferred))
+            starts.append(np.full(is_deferred.sum(), "0001-01-01", "datetime64[D]"))
+            stops.append(header_start_date[is_deferred])
+
+        # 3
+        rows, starts, stops = map(np.concatenate, (rows, starts, stops))
+        has_window = starts < stops
+        rows, starts, stops = rows[has_window], starts[has_window], stops[has_window]
+        self._rows = np.concatenate([rows, rows])
+        self._dates = np.concatenate([starts, stops])
+        self._deltas = np.concatenate([amount[rows], -amount[rows]])
+        self._opens = np.repeat(np.array([1, -1], dtype=np.int64), len(rows))
+        self._keys = df[list(KEYS.values())].reset_index(drop=True)
+        self._levels = {}
+
+    def _level(self, keys: tuple[str, ...]) -> tuple:
+        """Lookup, dates, running totals & open windows, bounds of a rollup."""
+        if keys not in self._levels:
+            if keys:
+                frame = self._keys[[KEYS[key] for key in keys]]
+                codes, uniques = pd.factorize(pd.MultiIndex.from_frame(frame))
+                lookup = {key: code for code, key in enumerate(uniques)}
+            else:
+                codes, lookup = np.zeros(len(self._keys), dtype=np.int64), {(): 0}
+
+            event_codes = codes[self._rows]
+            order = np.lexsort((self._dates, event_codes))
+            event_codes = event_codes[order]
+            running = (
+                pd.DataFrame({"total": self._deltas[order], "open": self._opens[order]})
+                .groupby(event_codes)
+                .cumsum()
+            )
+            totals, opens = running["total"].to_numpy(), running["open"].to_numpy()
+            bounds = np.searchsorted(event_codes, np.arange(len(lookup) + 1))
+            self._levels[keys] = (lookup, self._dates[order], totals, opens, bounds)
+        return self._levels[keys]
+
+    def query(self, when, customer=None, product=None, contract=None):
+        """ARR (or ACV) on `when` of every line matching the given keys.
+
+        Keys left as `None` are rolled up, e.g. only `product` gives the
+        ARR of that product across every customer & contract.
+
+        Args:
+            when (date | array-like): Date(s) to look at, any day works.
+            customer (str): Optional customer.
+            product (str): Optional `line.product`.
+            contract (int): Optional contract `id`.
+
+        Returns:
+            float | ndarray: One value per date, 0 for unknown keys.
+        """
+        given = {"customer": customer, "product": product, "contract": contract}
+        keys = tuple(key for key, value in given.items() if value is not None)
+        lookup, dates, totals, opens, bounds = self._level(keys)
+
+        when = np.asarray(when, dtype="datetime64[D]")
+        code = lookup.get(tuple(given[key] for key in keys))
+        if code is None or bounds[code] == bounds[code + 1]:
+            values = np.zeros(when.shape)
+        else:
+            lo, hi = bounds[code], bounds[code + 1]
+            idx = lo + np.searchsorted(dates[lo:hi], when, "right")
+            is_open = (idx > lo) & (opens[idx - 1] > 0)
+            values = np.where(is_open, totals[idx - 1], 0.0)
+
+        return values.item() if values.ndim == 0 else values
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+RENEWAL_COLUMNS = ["line.predecessor_id", "line.successor_id", "line.gap_days"]
+
+# a (customer & product, day) pair is packed in one int64, days get the low bits
+_DAY_BITS = 20
+
+
+def link_renewals(
+    df: pd.DataFrame, grace_days: int = 30, by_lines: bool = True
+) -> pd.DataFrame:
+    """Attach the contract each line renews, and the one renewing it.
+
+    Lines are first collapsed to one span per (id, customer, line.product),
+    so ramps inside a contract aren't renewals of themselves. Each span
+    is then linked to the latest span of another contract for the same
+    customer & product that ended before it started, at most
+    `grace_days` days earlier. Contracts that overlap the one before
+    them are not linked.
+
+    The link is an as-of join: span ends are sorted once by
+    (customer & product, end date) and every span start is looked up
+    in them with `searchsorted`.
+
+    If several contracts renew the same one, the earliest is its successor.
+
+    Args:
+        df (pd.DataFrame): Contracts in the `Contract.to_df` layout.
+        grace_days (int): Longest gap between the end of a contract and
+            the start of its renewal.
+        by_lines (bool): Use the line dates if `True`, else the header dates.
+
+    Returns:
+        pd.DataFrame: `df` with the `RENEWAL_COLUMNS`, `line.gap_days` is the
+            number of days without a contract before the line's contract
+            started, `<NA>` where nothing is linked.
+    """
+    col_name = "line" if by_lines else "header"
+    start_date = df[f"{col_name}.start_date"].to_numpy("datetime64[D]")
+    end_date = df[f"{col_name}.end_date"].to_numpy("datetime64[D]")
+
+    # 1
+    id_codes, ids = pd.factorize(df["id"])
+    customer_codes = pd.factorize(df["customer"])[0]
+    product_codes, products = pd.factorize(df["line.product"])
+    key = customer_codes.astype(np.int64) * (len(products) + 1) + product_codes
+    span, spans = pd.factorize(key * (len(ids) + 1) + id_codes)
+    spans = len(spans)
+
+    span_key = np.zeros(spans, dtype=np.int64)
+    span_key[span] = key
+    span_id = np.zeros(spans, dtype=np.int64)
+    span_id[span] = id_codes
+    span_start = np.full(spans, np.iinfo(np.int64).max)
+    np.minimum.at(span_start, span, start_date.astype(np.int64))
+    span_end = np.full(spans, np.iinfo(np.int64).min)
+    np.maximum.at(span_end, span, end_date.astype(np.int64))
+
+    # 2
+    shift = 1 << (_DAY_BITS - 1)
+    ends = (span_key << _DAY_BITS) + span_end + shift
+    starts = (span_key << _DAY_BITS) + span_start + shift
+    order = np.argsort(ends, kind="stable")
+    candidate = np.searchsorted(ends[order], starts, "left") - 1
+    prior = order[np.maximum(candidate, 0)]
+    gap_days = span_start - span_end[prior] - 1
+    predecessor = np.where(
+        (candidate >= 0) & (span_key[prior] == span_key) & (gap_days <= grace_days),
+        prior,
+        -1,
+    )
+
+    # 3
+    # by start date, the first renewal of a span is its successor
+    renewals = np.flatnonzero(predecessor >= 0)
+    renewals = renewals[np.argsort(span_start[renewals], kind="stable")]
+    renewed, first = np.unique(predecessor[renewals], return_index=True)
+    successor = np.full(spans, -1, dtype=np.int64)
+    successor[renewed] = renewals[first]
+
+    # 4
+    def per_line(values: np.ndarray, missing: np.ndarray) -> pd.arrays.IntegerArray:
+        values = pd.array(values, dtype="Int64")
+        values[missing] = pd.NA
+        return values[span]
+
+    span_ids = np.asarray(ids)[span_id]
+    df = df.drop(columns=RENEWAL_COLUMNS, errors="ignore").copy()
+    df["line.predecessor_id"] = per_line(span_ids[predecessor], predecessor < 0)
+    df["line.successor_id"] = per_line(span_ids[successor], successor < 0)
+    df["line.gap_days"] = per_line(gap_days, predecessor < 0)
+    return df
@@ -0,0 +1,109 @@
+from __future__ import annotations
+from .cuts import _customer_product_matrix
+
+import numpy as np
+import pandas as pd
+
+RETENTION_COLUMNS = [
+    "Starting ARR",
+    "Ending ARR",
+    "Retained ARR",
+    "Starting Customers",
+    "Retained Customers",
+    "NRR",
+    "GRR",
+    "Logo Retention",
+]
+
+
+def first_arr_period(df: pd.DataFrame) -> pd.Series:
+    """Signup cohort of every customer, the first period it had any ARR.
+
+    Args:
+        df (pd.DataFrame): Output of `annualize_df`.
+
+    Returns:
+        pd.Series: `cohort` period per customer, customers that never
+            had ARR are left out.
+    """
+    customers = _customer_product_matrix(df).groupby(level="customer").sum()
+    has_arr = customers.to_numpy() > 0
+    cohort = customers.columns[has_arr.argmax(axis=1)]
+    return pd.Series(cohort, index=customers.index, name="cohort")[has_arr.any(axis=1)]
+
+
+def retention_df(df: pd.DataFrame, months: int = 12, by: str = None) -> pd.DataFrame:
+    """Trailing NRR, GRR & logo retention for every period at once.
+
+    For every period the customers with ARR `months` earlier are the
+    starting customers. Their ARR now over their ARR then is the NRR,
+    capped at their ARR then (no expansion) it's the GRR, and the share
+    of them that still has ARR is the logo retention. New customers
+    don't count until they're `months` old.
+
+    All periods come from two shifted slices of the customer matrix,
+    groups are summed with one groupby.
+
+    Args:
+        df (pd.DataFrame): Output of `annualize_df`.
+        months (int): Look back, 12 for the trailing 12 months.
+        by (str): Optional `cohort` (see `first_arr_period`) or
+            `line.product`. By product a customer & product pair is the
+            unit, e.g. a customer dropping a product churns a logo of it.
+
+    Returns:
+        pd.DataFrame: `RETENTION_COLUMNS` indexed by period (and `by`),
+            for every period with a period `months` before it.
+    """
+    # 1
+    matrix = _customer_product_matrix(df)
+    if by == "line.product":
+        units = matrix
+        codes, groups = pd.factorize(
+            matrix.index.get_level_values("line.product"), sort=True
+        )
+    else:
+        units = matrix.groupby(level="customer").sum()
+        units = units[(units.to_numpy() > 0).any(axis=1)]
+        if by == "cohort":
+            first = (units.to_numpy() > 0).argmax(axis=1)
+            codes, groups = pd.factorize(units.columns[first], sort=True)
+        elif by is None:
+            codes, groups = np.zeros(len(units), dtype=np.int64), pd.Index([None])
+        else:
+            raise KeyError(by)
+
+    # 2
+    values = units.to_numpy()
+    a, b = values[:, :-months], values[:, months:]
+    starting = a > 0
+    parts = {
+        "Starting ARR": a,
+        "Ending ARR": np.where(starting, b, 0),
+        "Retained ARR": np.minimum(a, b),
+        "Starting Customers": starting,
+        "Retained Customers": starting & (b > 0),
+    }
+    periods = units.columns[months:]
+    sums = {
+        name: pd.DataFrame(part).groupby(codes).sum().to_numpy().ravel()
+        for name, part in parts.items()
+    }
+
+    # 3
+    result = pd.DataFrame(
+        sums,
+        index=pd.MultiIndex.from_product(
+            [groups, periods],
+            names=[by, "period"],
+        ),
+    )
+    result["NRR"] = result["Ending ARR"] / result["Starting ARR"]
+    result["GRR"] = result["Retained ARR"] / result["Starting ARR"]
+    result["Logo Retention"] = (
+        result["Retained Customers"] / result["Starting Customers"]
+    )
+
+    if by is None:
+        result = result.droplevel(0)
+    return result[RETENTION_COLUMNS]
@@ -0,0 +1,122 @@
+from __future__ import annotations
+from .query import KEYS
+
+from typing import Iterable
+
+import pandas as pd
+
+INDEX = ("customer", "id", "line.product")
+STANDARD_LEVELS = {
+    "contract": ("customer", "id"),
+    "customer_product": ("customer", "line.product"),
+    "customer": ("customer",),
+    "product": ("line.product",),
+    "total": (),
+}
+
+
+class CubeRollups:
+    """Cached aggregates of the customer cube for slicing & dicing.
+
+    The standard levels (`STANDARD_LEVELS`) are built once up front.
+    Any other rollup is summed from the smallest cached level that
+    has all of its keys, never from the cube unless it has to be,
+    and is cached as well.
+
+    Args:
+        df (pd.DataFrame): Output of `annualize_df`.
+
+    Example:
+        rollups = CubeRollups(annualize_df(CONTRACTS))
+        rollups["customer"]  # ARR per customer & period
+        rollups.get("product", customer="Customer 1")
+        rollups.get(periods=slice("2024-01-31", "2024-12-31"))  # total
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.name = df.columns.get_level_values(0)[0]
+        self._levels = {INDEX: df[self.name]}
+        for by in STANDARD_LEVELS.values():
+            self.rollup(by)
+
+    @staticmethod
+    def _keys(by: str | Iterable[str]) -> tuple[str, ...]:
+        """Level name or index levels to a tuple of index levels in cube order."""
+        if isinstance(by, str):
+            by = STANDARD_LEVELS[by] if by in STANDARD_LEVELS else (by,)
+        unknown = set(by) - set(INDEX)
+        if unknown:
+            raise KeyError(f"Not an index level of the cube: {sorted(unknown)}")
+        return tuple(key for key in INDEX if key in by)
+
+    @property
+    def levels(self) -> list[tuple[str, ...]]:
+        """Index levels of every cached rollup."""
+        return list(self._levels)
+
+    def rollup(self, by: str | Iterable[str] = ()) -> pd.DataFrame | pd.Series:
+        """Periods summed to `by`, cached.
+
+        Args:
+            by (str | Iterable[str]): A `STANDARD_LEVELS` name, an index
+                level or several of them. Empty for the total.
+
+        Returns:
+            pd.DataFrame | pd.Series: Indexed by `by` with a column per
+                period, the total is a Series indexed by period.
+        """
+        by = self._keys(by)
+        if by not in self._levels:
+            source = min(
+                (df for keys, df in self._levels.items() if set(by) <= set(keys)),
+                key=len,
+            )
+            if by:
+                self._levels[by] = source.groupby(level=list(by)).sum()
+            else:
+                self._levels[by] = source.sum().rename(self.name)
+        return self._levels[by]
+
+    def __getitem__(self, by: str | Iterable[str]) -> pd.DataFrame | pd.Series:
+        return self.rollup(by)
+
+    def get(
+        self,
+        by: str | Iterable[str] = (),
+        periods=None,
+        customer=None,
+        product=None,
+        contract=None,
+    ) -> pd.DataFrame | pd.Series:
+        """Slice of a rollup, e.g. per product for one customer.
+
+        Filtering on a key that isn't in `by` reads the cached level
+        with both, filters it and sums it down to `by`.
+
+        Args:
+            by (str | Iterable[str]): See `rollup`.
+            periods: Optional period label, list or slice to keep.
+            customer: Optional customer or list of customers.
+            product: Optional `line.product` or list of them.
+            contract: Optional contract `id` or list of them.
+
+        Returns:
+            pd.DataFrame | pd.Series: See `rollup`.
+        """
+        by = self._keys(by)
+        given = {"customer": customer, "product": product, "contract": contract}
+        where = {KEYS[key]: value for key, value in given.items() if value is not None}
+        df = self.rollup(by + tuple(where))
+
+        if where:
+            mask = True
+            for key, value in where.items():
+                values = value if isinstance(value, (list, tuple, set)) else [value]
+                mask &= df.index.get_level_values(key).isin(values)
+            df = df[mask]
+            if set(where) - set(by):
+                df = df.groupby(level=list(by)).sum() if by else df.sum()
+
+        if periods is not None:
+            df = df.loc[periods] if df.ndim == 1 else df.loc[:, periods]
+        return df
@@ -0,0 +1,148 @@
+from __future__ import annotations
+from .annualize import INTERVAL
+from .contract import (
+    annualize_long_df,
+    get_periods,
+    rollup_codes,
+    rollup_matrix,
+)
+from .instrument import stage
+from .periods import GRANULARITY
+
+import numpy as np
+import pandas as pd
+
+
+def booking_buckets(df: pd.DataFrame, known_at: np.ndarray) -> np.ndarray:
+    """Index of the first `known_at` date each line is known at.
+
+    A line is known from its `header.booking_date` on. Lines booked after
+    the last date get `len(known_at)`.
+    """
+    booking_date = df["header.booking_date"].to_numpy("datetime64[D]")
+    return np.searchsorted(known_at, booking_date, "left")
+
+
+def annualize_snapshots_df(
+    df: pd.DataFrame,
+    known_at=None,
+    rollup: str | list[str] = None,
+    by_lines: bool = True,
+    arr: bool = True,
+    deferred: bool = True,
+    periods=None,
+    interval_str: INTERVAL = "Month",
+    generalize_leap_year: bool = True,
+    granularity: GRANULARITY = "Month",
+) -> pd.DataFrame:
+    """ARR as known at each of several dates, from one build.
+
+    The snapshot at a `known_at` date only has the lines booked by then
+    (`header.booking_date <= known_at`). Lines are sorted into the
+    first snapshot they are known at and annualized & expanded once,
+    each snapshot is then the running total over the snapshots before
+    it. So 36 month-end restatements cost about one `annualize_df`.
+
+    With `rollup`, lines are summed straight into (snapshot, group,
+    period) cells like `annualize_rollup_df` and the running total is
+    a `cumsum` over the snapshots. Without it, every cell of the cube
+    row is repeated for the snapshots from the one its contract was booked in.
+
+    Args:
+        df (pd.DataFrame): Contracts in the `Contract.to_df` layout.
+        known_at (array-like): Snapshot dates. Defaults to the periods.
+        rollup (str | list[str]): Optional, see `annualize_rollup_df`.
+        by_lines (bool): Use the line dates if `True`, else the header dates.
+        arr (bool): Only keep renewable lines & name the value `ARR`,
+            otherwise keep everything & name it `ACV`.
+        deferred (bool): Include deferred periods.
+        periods (array-like): Periods to build. Defaults to
+            `get_periods(df, granularity)`.
+        interval_str (INTERVAL): See `annualize`.
+        generalize_leap_year (bool): See `annualize`.
+        granularity (GRANULARITY): See `annualize_df`.
+
+    Returns:
+        pd.DataFrame: Same as `annualize_df` (or `annualize_rollup_df`)
+            with a `known_at` level in front of the index. A snapshot's
+            rows only exist once it has something in them.
+
+    Example:
+        snapshots = annualize_snapshots_df(CONTRACTS, rollup="total")
+        snapshots.xs("2024-06-30", level="known_at")  # ARR as known then
+    """
+    if periods is None:
+        periods = get_periods(df, granularity)
+    periods = np.asarray(periods, dtype="datetime64[D]")
+    known_at = np.unique(
+        periods if known_at is None else np.asarray(known_at, dtype="datetime64[D]")
+    )
+    snapshots = len(known_at)
+
+    if arr:
+        df = df[df["line.renewable"] == True]
+
+    annualize_name = "ARR" if arr else "ACV"
+    options = dict(
+        by_lines=by_lines,
+        deferred=deferred,
+        interval_str=interval_str,
+        generalize_leap_year=generalize_leap_year,
+    )
+
+    # 1
+    with stage("booking", len(df)) as s:
+        bucket = booking_buckets(df, known_at)
+        df, bucket = df[bucket < snapshots], bucket[bucket < snapshots]
+        s.rows_out = len(df)
+
+    known_at_index = pd.Index(known_at.astype("datetime64[ns]"), name="known_at")
+
+    # 2
+    if rollup is not None:
+        codes, index = rollup_codes(df, rollup)
+        groups = len(index)
+        values, cells = rollup_matrix(
+            df, bucket * groups + codes, snapshots * groups, periods, **options
+        )
+        with stage("snapshots", snapshots * groups) as s:
+            shape = (snapshots, groups, len(periods))
+            values = np.cumsum(values.reshape(shape), axis=0).reshape(-1, len(periods))
+            cells = np.cumsum(cells.reshape(shape), axis=0).reshape(-1, len(periods))
+            values[cells == 0] = 0
+
+            keep_rows, keep_cols = cells.any(axis=1), cells.any(axis=0)
+            index = pd.MultiIndex.from_product([known_at_index, index])[keep_rows]
+            s.rows_out = len(index)
+
+        return pd.DataFrame(
+            values[np.ix_(keep_rows, keep_cols)],
+            index=index,
+            columns=pd.MultiIndex.from_product(
+                [[annualize_name], periods[keep_cols].astype("datetime64[ns]")],
+                names=[None, "period"],
+            ),
+        )
+
+    # 3
+    cube = annualize_long_df(df, arr=False, periods=periods, **options)
+    with stage("unstack", len(cube)) as s:
+        cube = cube.unstack(level="period").fillna(0)
+        cube.columns = cube.columns.set_levels([annualize_name], level=0)
+        s.rows_out = len(cube)
+
+    with stage("snapshots", len(cube)) as s:
+        first = pd.Series(bucket, index=df["id"].to_numpy()).groupby(level=0).min()
+        row_bucket = first.reindex(cube.index.get_level_values("id")).to_numpy()
+        rows = [np.flatnonzero(row_bucket <= k) for k in range(snapshots)]
+        snapshot = np.repeat(np.arange(snapshots), [len(r) for r in rows])
+        rows = np.concatenate(rows)
+        index = pd.MultiIndex(
+            levels=[known_at_index] + list(cube.index.levels),
+            codes=[snapshot] + [codes[rows] for codes in cube.index.codes],
+            names=["known_at"] + list(cube.index.names),
+        )
+        cube = pd.DataFrame(cube.to_numpy()[rows], index=index, columns=cube.columns)
+        s.rows_out = len(cube)
+
+    return cube
@@ -0,0 +1,151 @@
+from __future__ import annotations
+from .annualize import get_end_of_month_range
+from .contract import DATE_COLUMNS, annualize_long_df
+
+from datetime import date
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import numpy as np
+import pandas as pd
+
+
+def regroup_chunks(
+    chunks: Iterable[pd.DataFrame], key: str = "id"
+) -> Iterator[pd.DataFrame]:
+    """Re-cut chunks so a contract never straddles two of them.
+
+    The trailing run of `key` in each chunk is held back and put
+    in front of the next chunk. Lines of a contract have to be
+    next to each other in the input (e.g. sorted by `id`).
+
+    Args:
+        chunks (Iterable[pd.DataFrame]): Contracts in the `Contract.to_df` layout.
+        key (str): Column identifying a contract.
+
+    Yields:
+        pd.DataFrame: Chunks holding whole contracts only.
+    """
+    carry = None
+    for chunk in chunks:
+        if carry is not None:
+            chunk = pd.concat([carry, chunk], ignore_index=True)
+        if chunk.empty:
+            continue
+
+        ids = chunk[key].to_numpy()
+        other = ids[::-1] != ids[-1]
+        split = len(ids) - np.argmax(other) if other.any() else 0
+
+        carry = chunk.iloc[split:]
+        if split:
+            yield chunk.iloc[:split]
+
+    if carry is not None and not carry.empty:
+        yield carry
+
+
+def read_contract_chunks(
+    path: str | Path, chunksize: int = 100_000
+) -> Iterator[pd.DataFrame]:
+    """Read a CSV or Parquet file of contracts in chunks of whole contracts.
+
+    Parquet needs `pyarrow`. Rows have to be grouped by `id`, see `regroup_chunks`.
+
+    Args:
+        path (str | Path): `.csv` or `.parquet` file in the `Contract.to_df` layout.
+        chunksize (int): Rows per chunk read from the file.
+
+    Yields:
+        pd.DataFrame: Chunks holding whole contracts only.
+    """
+    path = Path(path)
+    if path.suffix == ".parquet":
+        import pyarrow.parquet as pq
+
+        batches = pq.ParquetFile(path).iter_batches(batch_size=chunksize)
+        chunks = (batch.to_pandas() for batch in batches)
+    else:
+        chunks = pd.read_csv(path, chunksize=chunksize)
+
+    for chunk in regroup_chunks(chunks):
+        for col in DATE_COLUMNS:
+            chunk[col] = chunk[col].astype("datetime64[ns]")
+        yield chunk
+
+
+def iter_annualize_df(
+    chunks: Iterable[pd.DataFrame],
+    start: date,
+    end: date,
+    by_lines: bool = True,
+    arr: bool = True,
+    deferred: bool = True,
+) -> Iterator[pd.DataFrame]:
+    """Streaming `annualize_df`, one cube partition per chunk of contracts.
+
+    The whole book is never in memory, so the period axis can't be
+    taken from it. `start` & `end` should be the earliest and latest
+    date of the book to line up with `annualize_df`.
+
+    Args:
+        chunks (Iterable[pd.DataFrame]): Contracts in the `Contract.to_df`
+            layout, e.g. from `read_contract_chunks`.
+        start (date): Start of the period axis.
+        end (date): End of the period axis.
+        by_lines (bool): See `annualize_df`.
+        arr (bool): See `annualize_df`.
+        deferred (bool): See `annualize_df`.
+
+    Yields:
+        pd.DataFrame: `annualize_df` of the contracts in the chunk.
+    """
+    periods = get_end_of_month_range(start, end)
+    for chunk in regroup_chunks(chunks):
+        df = annualize_long_df(chunk, by_lines, arr, deferred, periods)
+        yield df.unstack(level=0).fillna(0)
+
+
+def annualize_totals(
+    chunks: Iterable[pd.DataFrame],
+    start: date,
+    end: date,
+    by_lines: bool = True,
+    arr: bool = True,
+    deferred: bool = True,
+) -> pd.Series:
+    """Period totals of a book too big for memory, `annualize_df(df)["ARR"].sum()`.
+
+    Only one chunk and one running total per period are held at a time.
+
+    Args:
+        chunks (Iterable[pd.DataFrame]): See `iter_annualize_df`.
+        start (date): Start of the period axis.
+        end (date): End of the period axis.
+        by_lines (bool): See `annualize_df`.
+        arr (bool): See `annualize_df`.
+        deferred (bool): See `annualize_df`.
+
+    Returns:
+        pd.Series: Total per period, for the periods with any cells.
+    """
+    periods = get_end_of_month_range(start, end).astype("datetime64[ns]")
+    totals = np.zeros(len(periods))
+    cells = np.zeros(len(periods), dtype=np.int64)
+
+    for chunk in regroup_chunks(chunks):
+        df = annualize_long_df(chunk, by_lines, arr, deferred, periods)
+        period_idx = np.searchsorted(
+            periods, df.index.get_level_values("period").to_numpy()
+        )
+        totals += np.bincount(
+            period_idx, weights=df.iloc[:, 0].to_numpy(), minlength=len(periods)
+        )
+        cells += np.bincount(period_idx, minlength=len(periods))
+
+    has_cells = cells > 0
+    return pd.Series(
+        totals[has_cells],
+        index=pd.DatetimeIndex(periods[has_cells], name="period"),
+        name="ARR" if arr else "ACV",
+    )
@@ -1,6 +1,3 @@
-from inspect import getsource
-from IPython.display import Code
-
 def explain_code(func):
     """Helper function to break up the code.
     
@@ -9,6 +6,9 @@ def explain_code(func):
     yields that specific block to break it down a bit better
     in a notebook output.
     """
+    from inspect import getsource
+    from IPython.display import Code
+
     yield Code(func.__doc__, language= 'text')
     c = getsource(func).replace(func.__doc__, "")
     for x in range(1, 99):
@@ -0,0 +1,140 @@
+from __future__ import annotations
+from .annualize import INTERVAL, get_contract_term_array
+from .contract import HEADER_COLUMNS, LINE_COLUMNS
+from .instrument import stage
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+RULES = {
+    "missing_value": "A header or line column is empty.",
+    "header_end_before_start": "`header.end_date` is before its start date.",
+    "line_end_before_start": "`line.end_date` is before `line.start_date`.",
+    "zero_term": "The line's contract term is 0, it annualizes to 0.",
+    "line_outside_header": "The line starts before or ends after its header.",
+    "amount_mismatch": "The line amounts don't add up to `header.amount`.",
+    "duplicate_id": "The contract id is used by rows with different headers.",
+    "duplicate_line": "The row is an exact copy of another row.",
+}
+
+
+class ContractValidationError(ValueError):
+    pass
+
+
+@dataclass
+class ValidationReport:
+    """Result of `validate_contracts`.
+
+    Args:
+        flags (pd.DataFrame): A bool column per rule in `RULES`, one row per
+            violating row of the contracts, indexed like the contracts.
+        rows (int): Rows checked.
+    """
+
+    flags: pd.DataFrame
+    rows: int
+
+    @property
+    def ok(self) -> bool:
+        return self.flags.empty
+
+    def summary(self) -> pd.Series:
+        """Number of violating rows per rule."""
+        return self.flags.sum().rename("rows")
+
+    def violations(self, df: pd.DataFrame, rule: str = None) -> pd.DataFrame:
+        """Violating rows of `df` (the validated contracts), with their flags.
+
+        Args:
+            df (pd.DataFrame): The DataFrame passed to `validate_contracts`.
+            rule (str): Only rows breaking this rule.
+        """
+        flags = self.flags if rule is None else self.flags[self.flags[rule]]
+        return df.loc[flags.index].join(flags)
+
+    def raise_for_violations(self):
+        """Raise `ContractValidationError` if any rule is broken."""
+        if not self.ok:
+            counts = self.summary()
+            broken = ", ".join(
+                f"{rule} ({n:,})" for rule, n in counts[counts > 0].items()
+            )
+            raise ContractValidationError(
+                f"{len(self.flags):,} of {self.rows:,} rows are invalid: {broken}"
+            )
+
+
+def validate_contracts(
+    df: pd.DataFrame, interval_str: INTERVAL = "Month", amount_tolerance: float = 0.01
+) -> ValidationReport:
+    """Check every rule in `RULES` over a whole contract DataFrame at once.
+
+    Every rule is a columnar comparison, per-contract rules (amounts,
+    duplicate ids) use one `factorize` of `id` and `bincount`, so
+    this stays cheap next to `annualize_df`.
+
+    Args:
+        df (pd.DataFrame): Contracts in the `Contract.to_df` layout.
+        interval_str (INTERVAL): Interval of the term for `zero_term`.
+        amount_tolerance (float): Allowed difference for `amount_mismatch`.
+
+    Returns:
+        ValidationReport: Flags of the violating rows.
+    """
+    with stage("validate", len(df)) as s:
+        # 1
+        dates = {
+            col: df[col].to_numpy("datetime64[D]")
+            for col in HEADER_COLUMNS + LINE_COLUMNS
+            if "date" in col
+        }
+        flags = {
+            "missing_value": df[HEADER_COLUMNS + LINE_COLUMNS].isna().any(axis=1),
+            "header_end_before_start": dates["header.end_date"]
+            < dates["header.start_date"],
+            "line_end_before_start": dates["line.end_date"] < dates["line.start_date"],
+        }
+        term = get_contract_term_array(
+            dates["line.start_date"], dates["line.end_date"], True, interval_str
+        )
+        flags["zero_term"] = term == 0
+        flags["line_outside_header"] = (
+            dates["line.start_date"] < dates["header.start_date"]
+        ) | (dates["line.end_date"] > dates["header.end_date"])
+
+        # 2
+        # a missing id gets a code of its own, it's flagged `missing_value`
+        codes, ids = pd.factorize(df["id"], use_na_sentinel=False)
+        first_row = np.zeros(len(ids), dtype=np.int64)
+        first_row[codes[::-1]] = np.arange(len(codes))[::-1]
+        first_row = first_row[codes]
+
+        line_total = np.bincount(
+            codes, weights=df["line.amount"].fillna(0).to_numpy(float)
+        )[codes]
+        header_amount = df["header.amount"].to_numpy(float)
+        flags["amount_mismatch"] = ~(
+            np.abs(line_total - header_amount) <= amount_tolerance
+        )
+
+        differs = np.zeros(len(df), dtype=bool)
+        for col in HEADER_COLUMNS[1:]:
+            values = df[col].to_numpy()
+            # a missing value is `missing_value`, not a different header
+            missing = pd.isna(values)
+            differs |= (values != values[first_row]) & ~(missing | missing[first_row])
+        flags["duplicate_id"] = np.bincount(codes, weights=differs)[codes] > 0
+        flags["duplicate_line"] = df.duplicated(keep=False).to_numpy()
+
+        # 3
+        flags = pd.DataFrame(
+            {rule: np.asarray(flags[rule], dtype=bool) for rule in RULES},
+            index=df.index,
+        )
+        flags = flags[flags.to_numpy().any(axis=1)]
+        s.rows_out = len(flags)
+
+    return ValidationReport(flags, len(df))
@@ -0,0 +1,196 @@
+"""Benchmarks for the ARR pipeline at a few book sizes.
+
+Usage:
+    python -m benchmarks.bench_arr --scales 1000 100000 1000000 --output bench.json
+
+Every benchmark records wall time, peak traced memory and rows materialized.
+Results are written as JSON so runs on different commits can be compared.
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import time
+import tracemalloc
+from itertools import product
+from typing import Callable
+
+from arr import annualize, annualize_df, get_contract_term, get_end_of_month_range
+from arr import ContractLine
+from arr.contract import (
+    Contract,
+    contracts_from_df,
+    contracts_to_df,
+    expand_periods,
+    get_periods,
+)
+from data.build_contracts import generate_contracts
+
+import numpy as np
+import pandas as pd
+
+SCALES = [1_000, 100_000, 1_000_000]
+SEED = 0
+LINES_PER_CUSTOMER = 8
+
+
+def book(lines: int, seed: int = SEED) -> pd.DataFrame:
+    """A generated book of (about) `lines` lines, cut at a contract boundary."""
+    df = generate_contracts(seed, -(-lines // LINES_PER_CUSTOMER))
+    df = df[df["id"] <= df["id"].iloc[min(lines, len(df)) - 1]]
+    return df.reset_index(drop=True)
+
+
+def measure(func: Callable[[], int], memory: bool = True) -> dict:
+    """Run `func` (which returns rows materialized) for wall time & peak memory."""
+    start = time.perf_counter()
+    rows = func()
+    seconds = time.perf_counter() - start
+
+    peak = None
+    if memory:
+        tracemalloc.start()
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return {"seconds": seconds, "peak_bytes": peak, "rows": rows}
+
+
+def benchmarks(df: pd.DataFrame, seed: int, max_objects: int) -> dict:
+    """Name to callable for every benchmark over the book `df`."""
+    lines = [
+        ContractLine(*line)
+        for line in zip(
+            df["line.amount"].head(max_objects),
+            df["line.start_date"].dt.date.head(max_objects),
+            df["line.end_date"].dt.date.head(max_objects),
+            df["line.product"].head(max_objects),
+            df["line.renewable"].head(max_objects),
+        )
+    ]
+    periods = get_periods(df)
+    first_ids = df["id"].unique()[:max_objects]
+    contracts = list(contracts_from_df(df[df["id"].isin(first_ids)]))
+
+    def run_annualize():
+        for line in lines:
+            annualize(line, line.end_date, "Month")
+        return len(lines)
+
+    def run_get_contract_term():
+        for line in lines:
+            get_contract_term(line.start_date, line.end_date, True, "Day")
+        return len(lines)
+
+    def run_get_end_of_month_range():
+        return len(get_end_of_month_range(periods[0].item(), periods[-1].item()))
+
+    def run_generate_contracts():
+        return len(book(len(df), seed))
+
+    def run_to_df():
+        return sum(len(contract.to_df()) for contract in contracts)
+
+    def run_from_df():
+        grouped = df[df["id"].isin(first_ids)].groupby("id", sort=False)
+        return sum(len(Contract.from_df(group).lines) for _, group in grouped)
+
+    def run_contracts_to_df():
+        return len(contracts_to_df(contracts_from_df(df)))
+
+    def run_annualize_df(by_lines, arr, deferred):
+        lines = df[df["line.renewable"] == True] if arr else df
+        cells = len(expand_periods(lines, periods, by_lines, deferred)[0])
+
+        def run():
+            annualize_df(df, by_lines, arr, deferred)
+            return cells
+
+        return run
+
+    runs = {
+        "annualize": run_annualize,
+        "get_contract_term": run_get_contract_term,
+        "get_end_of_month_range": run_get_end_of_month_range,
+        "generate_contracts": run_generate_contracts,
+        "Contract.to_df": run_to_df,
+        "Contract.from_df": run_from_df,
+        "contracts_to_df(contracts_from_df)": run_contracts_to_df,
+    }
+    for flags in product([True, False], repeat=3):
+        name = "annualize_df(by_lines={}, arr={}, deferred={})".format(*flags)
+        runs[name] = run_annualize_df(*flags)
+    return runs
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(
+    scales: list[int] = SCALES,
+    seed: int = SEED,
+    memory: bool = True,
+    max_objects: int = 1_000,
+    only: list[str] | None = None,
+) -> dict:
+    """Run every benchmark at every scale.
+
+    Args:
+        scales (list[int]): Book sizes, in lines.
+        seed (int): Seed of the generated books.
+        memory (bool): Also measure peak memory (runs each benchmark twice).
+        max_objects (int): Cap on the lines / contracts the per-object
+            benchmarks (`annualize`, `Contract.to_df`, ...) loop over.
+        only (list[str]): Only run benchmarks whose name starts with one of these.
+
+    Returns:
+        dict: Environment info & one result per (benchmark, scale).
+    """
+    results = []
+    for scale in scales:
+        df = book(scale, seed)
+        for name, func in benchmarks(df, seed, max_objects).items():
+            if only and not any(name.startswith(prefix) for prefix in only):
+                continue
+            result = {"benchmark": name, "scale": scale, "lines": len(df)}
+            result.update(measure(func, memory))
+            results.append(result)
+            print("{benchmark:<55} {scale:>9,} {seconds:>9.3f}s".format(**result))
+
+    return {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "seed": seed,
+        "results": results,
+    }
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=SCALES)
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--output", default="bench.json")
+    parser.add_argument("--no-memory", action="store_true")
+    parser.add_argument("--max-objects", type=int, default=1_000)
+    parser.add_argument("--only", nargs="+")
+    args = parser.parse_args(argv)
+
+    report = run(
+        args.scales, args.seed, not args.no_memory, args.max_objects, args.only
+    )
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1 +1,6 @@
-from .build_contracts import CONTRACTS
\ No newline at end of file
+def __getattr__(name: str):
+    if name == "CONTRACTS":
+        from .build_contracts import CONTRACTS
+
+        return CONTRACTS
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
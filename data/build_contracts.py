@@ -1,194 +1,286 @@
-"""This is slop. I'm sorry."""
+"""Fake contracts for the notebooks & for load testing the ARR code.
 
+Nothing runs on import. `CONTRACTS` is built (seeded) on first access,
+`generate_contracts` can be called directly for bigger, custom books.
+"""
 
-from random import choices, choice
-from typing import List
 from datetime import date
+from functools import lru_cache
+from pathlib import Path
+from typing import Sequence
 
-from arr import Contract, ContractHeader, ContractLine
+from arr.assumptions import DOWNGRADE_CHANCE, EXPANSION_CHANCE, RENEWAL_CHANCE
+from arr.contract import DATE_COLUMNS, HEADER_COLUMNS, LINE_COLUMNS
+from arr.periods import add_months
 
 import pandas as pd
 import numpy as np
-from dateutil.relativedelta import relativedelta as rd
-
-print('generating fake contracts...')
 
 MIN_DATE = date(2020, 1, 1)
 MAX_DATE = date(2026, 12, 31)
-START_DATES = pd.date_range(MIN_DATE, MAX_DATE)
-RENEWAL_CHANCE = 0.8
-EXPANSION_CHANCE = 0.1
-DOWNGRADE_CHANCE = 0.1
-
-CUSTOMERS = pd.read_excel("data/saas_corp.xlsx", "customer")
-CUSTOMERS.set_index("key", inplace=True)
-
-PRODUCTS = pd.read_excel("data/saas_corp.xlsx", "product")
-PRODUCTS.set_index("key", inplace=True)
-PRODUCT_WEIGHTS = np.arange(0, 1, 1 / len(PRODUCTS))[::-1]
-PRODUCT_COUNT = len(PRODUCTS["product_name"].unique())
-
-print('reading manually added contracts...')
-CONTRACTS = pd.read_excel("data/saas_corp.xlsx", "contract")
-date_cols = [
-    "header.start_date",
-    "header.end_date",
-    "header.booking_date",
-    "line.start_date",
-    "line.end_date",
-]
-
-for col in date_cols:
-    CONTRACTS[col] = CONTRACTS[col].astype("datetime64[ns]")
-
-# print(
-#     CONTRACTS.dtypes,
-#     PRODUCTS.dtypes,
-#     CUSTOMERS.dtypes,
-#     sep="\n------------------------------------\n",
-# )
-
-
-def random_contract_range(
-    contract_lengths: List[int] = [3, 6, 12, 24, 36],
-    contract_weights: List[float] = [0.1, 0.05, 0.6, 0.2, 0.05],
-) -> int:
-    """Get a random contract length interval.
-
-    Wrapper for:
-    https://docs.python.org/3/library/random.html#random.choices
+CONTRACT_LENGTHS = [3, 6, 12, 24, 36]
+CONTRACT_WEIGHTS = [0.1, 0.05, 0.6, 0.2, 0.05]
+SEED = 0
+
+SAAS_CORP = Path(__file__).parent / "saas_corp.xlsx"
+
+
+@lru_cache
+def read_saas_corp(sheet: str) -> pd.DataFrame:
+    """Read a sheet (`customer`, `product` or `contract`) of `saas_corp.xlsx`."""
+    df = pd.read_excel(SAAS_CORP, sheet)
+    if sheet == "contract":
+        for col in DATE_COLUMNS:
+            df[col] = df[col].astype("datetime64[ns]")
+    else:
+        df.set_index("key", inplace=True)
+    return df
+
+
+def _random_contract_ends(rng: np.random.Generator, start_dates: np.ndarray):
+    """Draw a contract length per start date, return the end dates."""
+    lengths = rng.choice(CONTRACT_LENGTHS, len(start_dates), p=CONTRACT_WEIGHTS)
+    return add_months(start_dates, lengths) - np.timedelta64(1, "D")
+
+
+def _pick_one(rng: np.random.Generator, allowed: np.ndarray) -> np.ndarray:
+    """One random `True` column per row of `allowed`, as a one-hot matrix."""
+    keys = np.where(allowed, rng.random(allowed.shape), -1)
+    return np.eye(allowed.shape[1], dtype=bool)[keys.argmax(axis=1)]
+
+
+def generate_contracts(
+    seed: int | None = None,
+    customers: int | Sequence[str] = 150,
+    start: date = MIN_DATE,
+    end: date = MAX_DATE,
+    products: pd.DataFrame | None = None,
+    first_id: int = 1,
+    renewal_chance: float = RENEWAL_CHANCE,
+    expansion_chance: float = EXPANSION_CHANCE,
+    downgrade_chance: float = DOWNGRADE_CHANCE,
+) -> pd.DataFrame:
+    """Simulate an initial sale and renewal cycles for every customer.
+
+    Every step is drawn for all customers still renewing at once:
+
+    1. Initial sale, a random start date between `start` & `end`, a random
+        contract length and a random set of products.
+    2. Renewal cycles, a contract that ends before `end` renews with
+        `renewal_chance`. A renewal may add one product (`expansion_chance`)
+        and may drop one (`downgrade_chance`) if there's more than one.
+        Once a customer doesn't renew they're done.
 
     Args:
-        contract_lengths (List[int], optional): Possible contract lengths, in months.
-            Defaults to [3, 6, 12, 24, 36].
-        contract_weights (List[float], optional): Weights of the `contract_lengths`, arg.
-            Defaults to [0.1, 0.05, 0.6, 0.2, 0.05].
+        seed (int): Seed of the random generator, `None` for a random one.
+        customers (int | Sequence[str]): Number of customers or their names.
+        start (date): Earliest start date of an initial sale.
+        end (date): Contracts ending after this date don't renew.
+        products (pd.DataFrame): `product_name`, `amount` & `renewable` per
+            product. Defaults to the `product` sheet of `saas_corp.xlsx`.
+        first_id (int): Id of the first contract, the rest count up.
+        renewal_chance (float): Chance a contract renews.
+        expansion_chance (float): Chance a renewal adds a product.
+        downgrade_chance (float): Chance a renewal drops a product.
 
     Returns:
-        int: Length of contract in months.
+        pd.DataFrame: Contracts in the `Contract.to_df` layout, with unique ids.
     """
-    return choices(contract_lengths, contract_weights)[0]
-
-
-def initial_sale(customer: str) -> Contract:
-    """Get customer start, end dates. Get customer items for first sale"""
-
-    # TODO Return manual contract
-    start_date = choice(START_DATES).date()
-    contract_range = random_contract_range()
-    end_date = start_date + rd(months=contract_range, days=-1)
-
-    num_of_items = choices(range(1, PRODUCT_COUNT + 1), PRODUCT_WEIGHTS)[0]
-    products = PRODUCTS.loc[np.random.choice(PRODUCTS.index, num_of_items, False)]
-
-    contract = Contract(
-        id=CONTRACTS["id"].max() + 1,
-        header=ContractHeader(products["amount"].sum(), start_date, end_date),
-        lines=[
-            ContractLine(
-                row[1]["amount"],
-                start_date,
-                end_date,
-                row[1]["product_name"],
-                row[1]["renewable"],
-            )
-            for row in products.iterrows()
-        ],
-        customer=customer,
+    rng = np.random.default_rng(seed)
+    if isinstance(customers, int):
+        customers = [f"Customer {i}" for i in range(1, customers + 1)]
+    customers = np.asarray(customers, dtype=object)
+    if products is None:
+        products = read_saas_corp("product")
+
+    product_count = len(products)
+    product_weights = np.arange(0, 1, 1 / product_count)[::-1]
+    end = np.datetime64(end, "D")
+
+    # 1
+    customer_idx = np.arange(len(customers))
+    start_dates = np.datetime64(start, "D") + rng.integers(
+        0, (end - np.datetime64(start, "D")).astype(np.int64) + 1, len(customers)
     )
-
-    return contract
-
-
-def renewal(contract: Contract) -> Contract | None:
-    could_renew = True if contract.header.end_date < MAX_DATE else False
-    will_renew = choices([True, False], [RENEWAL_CHANCE, 1 - RENEWAL_CHANCE])[0]
-    will_expand = choices([True, False], [EXPANSION_CHANCE, 1 - EXPANSION_CHANCE])[0]
-    will_downgrade = choices([True, False], [DOWNGRADE_CHANCE, 1 - DOWNGRADE_CHANCE])[0]
-
-    start_date = contract.header.end_date + rd(days=1)
-    end_date = start_date + rd(months=random_contract_range(), days=-1)
-
-    df = contract.to_df()
-
-    current_products = PRODUCTS[
-        PRODUCTS["product_name"].isin(df["line.product"].unique())
-    ]
-
-    potential_products = PRODUCTS[
-        ~PRODUCTS["product_name"].isin(current_products["product_name"].unique())
-    ]
-
-    new_products = current_products
-
-    if will_expand and len(current_products) < PRODUCT_COUNT:
-        expansion = potential_products.loc[
-            np.random.choice(potential_products.index, 1, False)
-        ]
-        new_products = pd.concat([expansion, current_products])
-
-    if will_downgrade and len(current_products) > 1:
-        rand_prod = np.random.choice(new_products.index, 1, False)
-        new_products = new_products.drop(index=rand_prod)
-
-    contract = Contract(
-        id=CONTRACTS["id"].max() + 1,
-        header=ContractHeader(new_products["amount"].sum(), start_date, end_date),
-        lines=[
-            ContractLine(
-                row[1]["amount"],
-                start_date,
-                end_date,
-                row[1]["product_name"],
-                row[1]["renewable"],
-            )
-            for row in new_products.iterrows()
-        ],
-        customer=contract.customer,
+    end_dates = _random_contract_ends(rng, start_dates)
+    item_count = rng.choice(
+        np.arange(1, product_count + 1),
+        len(customers),
+        p=product_weights / product_weights.sum(),
+    )
+    ranks = rng.random((len(customers), product_count)).argsort(axis=1).argsort(axis=1)
+    held = ranks < item_count[:, None]
+    cycles = [(customer_idx, start_dates, end_dates, held)]
+
+    # 2
+    cycles += _renewal_cycles(
+        rng,
+        customer_idx,
+        end_dates,
+        held,
+        end,
+        renewal_chance,
+        expansion_chance,
+        downgrade_chance,
     )
 
-    if could_renew and will_renew:
-        return contract
-    else:
-        return None
+    # 3
+    return _cycles_to_df(cycles, customers, products, first_id)
 
 
-# initial sales
-print('performing initial sales...')
-for customer in CUSTOMERS["customer"].unique():
+def _renewal_cycles(
+    rng: np.random.Generator,
+    customer_idx: np.ndarray,
+    end_dates: np.ndarray,
+    held: np.ndarray,
+    end: np.datetime64,
+    renewal_chance: float,
+    expansion_chance: float,
+    downgrade_chance: float,
+) -> list[tuple]:
+    """Renew the given contracts until every customer stopped renewing.
 
-    if customer in CONTRACTS["customer"].unique():
-        pass
-        # print(f"{customer} already in contract list")
+    `held` is the one-hot products of each contract. Returns a
+    (customer_idx, start_dates, end_dates, held) tuple per cycle.
+    """
+    product_count = held.shape[1]
+    cycles = []
+    while len(customer_idx):
+        renews = (end_dates < end) & (rng.random(len(customer_idx)) < renewal_chance)
+        expands = rng.random(len(customer_idx)) < expansion_chance
+        downgrades = rng.random(len(customer_idx)) < downgrade_chance
+
+        expands &= held.sum(axis=1) < product_count
+        new_held = held | (_pick_one(rng, ~held) & expands[:, None])
+        downgrades &= held.sum(axis=1) > 1
+        new_held &= ~(_pick_one(rng, new_held) & downgrades[:, None])
+
+        customer_idx = customer_idx[renews]
+        start_dates = end_dates[renews] + np.timedelta64(1, "D")
+        end_dates = _random_contract_ends(rng, start_dates)
+        held = new_held[renews]
+        if len(customer_idx):
+            cycles.append((customer_idx, start_dates, end_dates, held))
+    return cycles
+
+
+def _cycles_to_df(
+    cycles: list[tuple],
+    customers: np.ndarray,
+    products: pd.DataFrame,
+    first_id: int,
+) -> pd.DataFrame:
+    """Contracts of every cycle in the `Contract.to_df` layout."""
+    customer_idx, start_dates, end_dates, held = (
+        np.concatenate(arrays) for arrays in zip(*cycles)
+    )
+    ids = np.arange(first_id, first_id + len(customer_idx))
+    amounts = products["amount"].to_numpy()
+    contract_idx, product_idx = np.nonzero(held)
+    start_dates = start_dates[contract_idx].astype("datetime64[ns]")
+    end_dates = end_dates[contract_idx].astype("datetime64[ns]")
+
+    df = pd.DataFrame(
+        {
+            "id": ids[contract_idx],
+            "customer": customers[customer_idx[contract_idx]],
+            "header.amount": (held * amounts).sum(axis=1)[contract_idx],
+            "header.start_date": start_dates,
+            "header.end_date": end_dates,
+            "header.booking_date": start_dates,
+            "line.amount": amounts[product_idx],
+            "line.start_date": start_dates,
+            "line.end_date": end_dates,
+            "line.product": products["product_name"].to_numpy()[product_idx],
+            "line.renewable": products["renewable"].to_numpy(bool)[product_idx],
+        }
+    )
+    df["customer"] = df["customer"].astype(str)
+    df["line.product"] = df["line.product"].astype(str)
+    return df[HEADER_COLUMNS + LINE_COLUMNS]
+
+
+def renew_contracts(
+    df: pd.DataFrame,
+    seed: int | None = None,
+    end: date = MAX_DATE,
+    products: pd.DataFrame | None = None,
+    first_id: int | None = None,
+    renewal_chance: float = RENEWAL_CHANCE,
+    expansion_chance: float = EXPANSION_CHANCE,
+    downgrade_chance: float = DOWNGRADE_CHANCE,
+) -> pd.DataFrame:
+    """Renewal cycles of existing contracts, like `generate_contracts` step 2.
+
+    The latest contract (highest `id`) of every customer in `df` goes
+    through the renewal cycles with the products it has. Renewals are
+    priced from `products`, like generated ones.
 
-    else:
+    Args:
+        df (pd.DataFrame): Contracts in the `Contract.to_df` layout, their
+            products must be in `products`.
+        seed (int): Seed of the random generator, `None` for a random one.
+        end (date): Contracts ending after this date don't renew.
+        products (pd.DataFrame): See `generate_contracts`.
+        first_id (int): Id of the first renewal. Defaults to the one
+            after the highest id of `df`.
+        renewal_chance (float): Chance a contract renews.
+        expansion_chance (float): Chance a renewal adds a product.
+        downgrade_chance (float): Chance a renewal drops a product.
 
-        CONTRACTS = pd.concat(
-            [CONTRACTS, initial_sale(customer).to_df()], ignore_index=True
-        )
-
-# subsequent renewals
-# this is so badly written, sorry.
-print('performing subsequent renewals...')
-renew_cycle = True
-renew_cycle_count = 0
-no_more_renewal = []
-while renew_cycle:
-    renew_cycle_count += 1
-    print(f'performing renewal cycle {renew_cycle_count}...')
-    next_cycle = False
-    contracts_to_check = (
-        CONTRACTS[["customer", "id"]].groupby("customer").max()["id"].to_numpy()
+    Returns:
+        pd.DataFrame: Only the renewals, in the `Contract.to_df` layout.
+    """
+    rng = np.random.default_rng(seed)
+    if products is None:
+        products = read_saas_corp("product")
+    if first_id is None:
+        first_id = df["id"].max() + 1
+
+    # 1
+    last = df[df["id"].isin(df.groupby("customer")["id"].max())]
+    ids, contract_idx = np.unique(last["id"].to_numpy(), return_inverse=True)
+    product_idx = pd.Index(products["product_name"]).get_indexer(last["line.product"])
+    held = np.zeros((len(ids), len(products)), dtype=bool)
+    held[contract_idx, product_idx] = True
+    headers = last.groupby("id")[["customer", "header.end_date"]].first().loc[ids]
+
+    # 2
+    cycles = _renewal_cycles(
+        rng,
+        np.arange(len(ids)),
+        headers["header.end_date"].to_numpy("datetime64[D]"),
+        held,
+        np.datetime64(end, "D"),
+        renewal_chance,
+        expansion_chance,
+        downgrade_chance,
+    )
+    no_dates = np.zeros(0, dtype="datetime64[D]")
+    empty = (np.zeros(0, dtype=np.int64), no_dates, no_dates, held[:0])
+    customers = headers["customer"].to_numpy(dtype=object)
+    return _cycles_to_df(cycles or [empty], customers, products, first_id)
+
+
+def build_contracts(seed: int | None = SEED) -> pd.DataFrame:
+    """The SaaS Corp book, manual contracts in `saas_corp.xlsx` & their
+    renewals, plus generated ones for every other customer."""
+    manual = read_saas_corp("contract")
+    customers = read_saas_corp("customer")["customer"]
+    generated = generate_contracts(
+        seed,
+        customers[~customers.isin(manual["customer"])].unique(),
+        first_id=manual["id"].max() + 1,
     )
-    for contract_id in contracts_to_check:
-        contract = Contract.from_df(CONTRACTS[CONTRACTS["id"] == contract_id])
-        renew_contract = renewal(contract)
-        if renew_contract is None or contract.customer in no_more_renewal:
-            no_more_renewal.append(contract.customer)
-        else:
-            df = renew_contract.to_df()
-            CONTRACTS = pd.concat([df, CONTRACTS], ignore_index=True)
-            next_cycle = True
-    renew_cycle = next_cycle
-
-print(f'Contracts generated... see `CONTRACTS` variable')
+    # a stream of its own, the generated customers stay the same
+    renew_seed = np.random.SeedSequence(seed).spawn(1)[0]
+    renewed = renew_contracts(manual, renew_seed, first_id=generated["id"].max() + 1)
+    return pd.concat([manual, generated, renewed], ignore_index=True)
+
+
+def __getattr__(name: str):
+    if name == "CONTRACTS":
+        global CONTRACTS
+        CONTRACTS = build_contracts()
+        return CONTRACTS
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,73 @@
+from datetime import date
+
+from arr import Contract, ContractHeader, ContractLine, annualize_df
+from arr.contract import contracts_to_df
+
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def contracts_df():
+    contracts = [
+        Contract(
+            1,
+            ContractHeader(36_000, date(2024, 1, 1), date(2026, 12, 31)),
+            [
+                ContractLine(4_000, date(2024, 1, 1), date(2024, 12, 31), "A", True),
+                ContractLine(6_000, date(2025, 1, 1), date(2025, 12, 31), "A", True),
+                ContractLine(8_000, date(2026, 1, 1), date(2026, 12, 31), "A", True),
+                ContractLine(6_000, date(2024, 1, 1), date(2024, 12, 31), "B", False),
+            ],
+            "Customer1",
+        ),
+        Contract(
+            2,
+            ContractHeader(
+                10_000, date(2024, 1, 15), date(2025, 1, 14), date(2023, 6, 30)
+            ),
+            [
+                ContractLine(5_000, date(2024, 1, 15), date(2025, 1, 14), "A", True),
+                ContractLine(5_000, date(2024, 3, 1), date(2025, 1, 14), "C", True),
+            ],
+            "Customer2",
+        ),
+        Contract(
+            3,
+            ContractHeader(2_500, date(2024, 2, 10), date(2024, 2, 20)),
+            [ContractLine(2_500, date(2024, 2, 10), date(2024, 2, 20), "B", True)],
+            "Customer3",
+        ),
+    ]
+    return pd.concat([c.to_df() for c in contracts], ignore_index=True)
+
+
+@pytest.fixture
+def cube():
+    """Cube of a year of ARR movements, every cut happens in Jan 2025."""
+    contracts = [
+        Contract(
+            1,
+            ContractHeader(22_000, date(2024, 1, 1), date(2025, 12, 31)),
+            [
+                ContractLine(5_000, date(2024, 1, 1), date(2024, 12, 31), "A", True),
+                ContractLine(3_000, date(2024, 1, 1), date(2024, 12, 31), "B", True),
+                ContractLine(10_000, date(2025, 1, 1), date(2025, 12, 31), "A", True),
+                ContractLine(4_000, date(2025, 1, 1), date(2025, 12, 31), "C", True),
+            ],
+            "Customer1",
+        ),
+        Contract(
+            2,
+            ContractHeader(6_000, date(2024, 1, 1), date(2024, 12, 31)),
+            [ContractLine(6_000, date(2024, 1, 1), date(2024, 12, 31), "A", True)],
+            "Customer2",
+        ),
+        Contract(
+            3,
+            ContractHeader(1_000, date(2025, 1, 1), date(2025, 12, 31)),
+            [ContractLine(1_000, date(2025, 1, 1), date(2025, 12, 31), "B", True)],
+            "Customer3",
+        ),
+    ]
+    return annualize_df(contracts_to_df(contracts))
@@ -0,0 +1,57 @@
+from datetime import date, timedelta
+from random import Random
+
+from arr import ContractHeader, annualize, annualize_array, get_contract_term
+from arr import get_contract_term_array
+from arr.annualize import count_leap_days, count_leap_days_array
+
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def date_ranges():
+    rng = Random(0)
+    starts = [date(1999, 1, 1) + timedelta(days=rng.randrange(12_000)) for _ in range(500)]
+    ends = [start + timedelta(days=rng.randrange(-5, 2_000)) for start in starts]
+    periods = [start + timedelta(days=rng.randrange(1_500)) for start in starts]
+    return starts, ends, periods
+
+
+def test_count_leap_days_array(date_ranges):
+    starts, ends, _ = date_ranges
+    expected = [count_leap_days(s, e) for s, e in zip(starts, ends)]
+    np.testing.assert_array_equal(count_leap_days_array(starts, ends), expected)
+    assert count_leap_days(date(1900, 1, 1), date(2000, 12, 31)) == 25
+
+
+@pytest.mark.parametrize("interval_str", ["Year", "Quarter", "Month", "Day"])
+@pytest.mark.parametrize("generalize_leap_year", [True, False])
+def test_array_matches_scalar(date_ranges, interval_str, generalize_leap_year):
+    starts, ends, periods = date_ranges
+    amounts = np.arange(1, len(starts) + 1) * 1_000
+
+    terms = get_contract_term_array(starts, ends, generalize_leap_year, interval_str)
+    np.testing.assert_array_equal(
+        terms,
+        [
+            get_contract_term(s, e, generalize_leap_year, interval_str)
+            for s, e in zip(starts, ends)
+        ],
+    )
+
+    result = annualize_array(
+        amounts, starts, ends, periods, interval_str, generalize_leap_year
+    )
+    expected = [
+        annualize(ContractHeader(a, s, e), p, interval_str, generalize_leap_year)
+        for a, s, e, p in zip(amounts, starts, ends, periods)
+    ]
+    np.testing.assert_array_equal(result, expected)
+
+
+def test_annualize_array_needs_periods_for_days():
+    start, end = [date(2024, 1, 1)], [date(2024, 12, 31)]
+    with pytest.raises(ValueError, match="periods"):
+        annualize_array([36_500], start, end, None, "Day", False)
+    assert annualize_array([36_500], start, end, None, "Day", True) == [36_500]
@@ -0,0 +1,15 @@
+import json
+
+from benchmarks.bench_arr import main
+
+
+def test_benchmarks_smoke(tmp_path):
+    output = tmp_path / "bench.json"
+    main(["--scales", "200", "--max-objects", "20", "--output", str(output)])
+
+    report = json.loads(output.read_text())
+    assert len(report["results"]) == 15
+    for result in report["results"]:
+        assert result["seconds"] >= 0
+        assert result["peak_bytes"] > 0
+        assert result["rows"] > 0
@@ -0,0 +1,30 @@
+from arr import Contract
+from arr.book import ContractBook
+
+import pandas as pd
+
+
+def test_contract_book_round_trip(contracts_df):
+    book = ContractBook.from_df(contracts_df)
+
+    assert len(book) == 3
+    assert list(book.ids) == [1, 2, 3]
+    pd.testing.assert_frame_equal(
+        book.to_df(), contracts_df, check_dtype=False, check_categorical=False
+    )
+
+    view = book.get(2)
+    contract = Contract.from_df(contracts_df[contracts_df["id"] == 2])
+    assert view.to_contract() == contract
+    assert repr(view) == repr(contract)
+    assert not hasattr(view, "__dict__")
+    pd.testing.assert_frame_equal(
+        view.to_df(), contract.to_df(), check_dtype=False, check_categorical=False
+    )
+
+    book = ContractBook.from_contracts(
+        [Contract.from_df(df) for _, df in contracts_df.groupby("id")]
+    )
+    pd.testing.assert_frame_equal(
+        book.to_df(), contracts_df, check_dtype=False, check_categorical=False
+    )
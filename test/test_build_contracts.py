@@ -0,0 +1,78 @@
+from datetime import date
+
+from data.build_contracts import (
+    add_months,
+    build_contracts,
+    generate_contracts,
+    renew_contracts,
+)
+
+import numpy as np
+import pandas as pd
+import pytest
+from dateutil.relativedelta import relativedelta
+
+
+@pytest.fixture
+def products():
+    return pd.DataFrame(
+        {
+            "product_name": ["A", "B", "C", "D"],
+            "amount": [1_000, 2_000, 3_000, 4_000],
+            "renewable": [True, True, True, False],
+        }
+    )
+
+
+def test_add_months():
+    dates = [date(2024, 1, 31), date(2023, 11, 30), date(2024, 2, 29)]
+    months = [1, 3, 12]
+    np.testing.assert_array_equal(
+        add_months(np.array(dates, dtype="datetime64[D]"), months),
+        np.array(
+            [d + relativedelta(months=m) for d, m in zip(dates, months)],
+            dtype="datetime64[D]",
+        ),
+    )
+
+
+def test_generate_contracts(products):
+    df = generate_contracts(7, 500, products=products)
+    pd.testing.assert_frame_equal(df, generate_contracts(7, 500, products=products))
+
+    headers = df.groupby("id")[["customer", "header.start_date", "header.end_date"]]
+    assert (headers.nunique() == 1).all().all()
+    assert df["customer"].nunique() == 500
+    assert (
+        df.groupby("id")["line.amount"].sum()
+        == df.groupby("id")["header.amount"].first()
+    ).all()
+
+    # renewals start the day after the previous contract ends
+    headers = headers.first().sort_values(["customer", "header.start_date"])
+    previous_end = headers.groupby("customer")["header.end_date"].shift()
+    gap = (headers["header.start_date"] - previous_end).dropna()
+    assert (gap == pd.Timedelta(days=1)).all()
+    assert (previous_end.dropna() < pd.Timestamp(2026, 12, 31)).all()
+
+
+def test_renew_contracts(products):
+    df = generate_contracts(7, 50, products=products, renewal_chance=0)
+    renewed = renew_contracts(df, 1, products=products, renewal_chance=1)
+
+    assert renewed["id"].min() == df["id"].max() + 1
+    first = renewed.groupby("customer")["header.start_date"].min()
+    last_end = df.groupby("customer")["header.end_date"].max()
+    ending = last_end[last_end < pd.Timestamp(2026, 12, 31)]
+    assert (first.loc[ending.index] == ending + pd.Timedelta(days=1)).all()
+    assert set(first.index) == set(ending.index)
+
+
+def test_build_contracts_renews_manual_contracts():
+    # Abatz is a manual contract ending 2024-12-31, it renews with this seed
+    df = build_contracts(1)
+    abatz = df[df["customer"] == "Abatz"].groupby("id")["header.start_date"].first()
+    assert abatz.loc[1] == pd.Timestamp(2024, 1, 1)
+    assert (abatz.drop(1) > pd.Timestamp(2024, 12, 31)).all()
+    assert len(abatz) > 1
+    assert df.groupby("id")["customer"].nunique().max() == 1
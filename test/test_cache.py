@@ -0,0 +1,46 @@
+from arr import annualize_df
+from arr.cache import CubeCache, hash_contracts
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+
+def test_cube_cache(contracts_df, tmp_path):
+    cache = CubeCache(tmp_path)
+
+    cube = cache.annualize_df(contracts_df, arr=False)
+    assert len(list(tmp_path.glob("*.feather"))) == 1
+    pd.testing.assert_frame_equal(cube, annualize_df(contracts_df, arr=False))
+    pd.testing.assert_frame_equal(cache.annualize_df(contracts_df, arr=False), cube)
+
+    changed = contracts_df.assign(**{"line.amount": contracts_df["line.amount"] + 1})
+    assert hash_contracts(changed) != hash_contracts(contracts_df)
+    assert hash_contracts(contracts_df, arr=True) != hash_contracts(contracts_df)
+
+    cache.max_bytes = 0
+    cache.annualize_df(changed)
+    assert list(tmp_path.glob("*.feather")) == []
+
+
+def test_cube_cache_empty_cube(contracts_df, tmp_path):
+    cache = CubeCache(tmp_path)
+    not_renewable = contracts_df[contracts_df["line.renewable"] == False]
+
+    cube = cache.annualize_df(not_renewable)
+    assert cube.empty
+    pd.testing.assert_frame_equal(cache.annualize_df(not_renewable), cube)
+
+
+def test_cube_cache_unreadable_entry(contracts_df, tmp_path):
+    cache = CubeCache(tmp_path)
+    key = hash_contracts(contracts_df, by_lines=True, arr=True, deferred=True)
+    (tmp_path / f"{key}.feather").write_bytes(b"partly written")
+
+    assert cache.get(key) is None
+    pd.testing.assert_frame_equal(
+        cache.annualize_df(contracts_df), annualize_df(contracts_df)
+    )
+    pd.testing.assert_frame_equal(cache.get(key), annualize_df(contracts_df))
+    assert [path.suffix for path in tmp_path.iterdir()] == [".feather"]
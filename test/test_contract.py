@@ -0,0 +1,241 @@
+from itertools import product
+
+from arr import Contract, ContractLine, active_check, annualize, annualize_df
+from arr import deferred_check, get_end_of_month_range
+from arr.contract import contracts_from_df, contracts_to_df
+from arr.contract import compact_to_wide, expand_periods, get_periods
+from arr.contract import period_codes, period_dates
+
+import pandas as pd
+import pytest
+
+
+def annualize_df_rowwise(
+    df, by_lines: bool = True, arr: bool = True, deferred: bool = True
+) -> pd.DataFrame:
+    """Row-wise reference implementation of `annualize_df`.
+
+    Kept around to check the vectorized version against.
+    """
+
+    min_date = min(df.select_dtypes("datetime64").min()).date()
+    max_date = max(df.select_dtypes("datetime64").max()).date()
+
+    range = pd.DataFrame(get_end_of_month_range(min_date, max_date)).rename(
+        columns={0: "period"}
+    )
+    df = range.merge(df, how="cross")
+
+    df["period"] = df["period"].astype("datetime64[ns]")
+
+    col_name = "line" if by_lines else "header"
+
+    df["active"] = df.apply(
+        lambda row: active_check(
+            row[f"{col_name}.start_date"],
+            row[f"{col_name}.end_date"],
+            row["period"],
+        ),
+        axis=1,
+    )
+
+    df["deferred"] = df.apply(
+        lambda row: deferred_check(
+            row["header.booking_date"],
+            row["header.start_date"],
+            row["line.start_date"],
+            row["period"],
+        ),
+        axis=1,
+    )
+
+    annualize_name = "ARR" if arr else "ACV"
+
+    df[annualize_name] = df.apply(
+        lambda row: annualize(
+            ContractLine(
+                row[f"line.amount"],
+                row[f"{col_name}.start_date"].date(),
+                row[f"{col_name}.end_date"].date(),
+                row["line.product"],
+                row["line.renewable"],
+            ),
+            row["period"].date(),
+            "Month",
+            True,
+            False,
+        ),
+        axis=1,
+    )
+
+    cols = ["period", "customer", "id", "line.product"]
+
+    if arr:
+        df = df[df["line.renewable"] == True]
+
+    if deferred:
+        df = df[(df["active"] == True) | (df["deferred"] == True)]
+    else:
+        df = df[df["active"] == True]
+
+    df = pd.DataFrame(df[cols + [annualize_name]].groupby(cols).sum()).unstack(level=0)
+
+    df.fillna(0, inplace=True)
+
+    return df
+
+
+@pytest.mark.parametrize(
+    "by_lines, arr, deferred", list(product([True, False], repeat=3))
+)
+def test_annualize_df_matches_rowwise(contracts_df, by_lines, arr, deferred):
+    pd.testing.assert_frame_equal(
+        annualize_df(contracts_df, by_lines, arr, deferred),
+        annualize_df_rowwise(contracts_df, by_lines, arr, deferred),
+    )
+
+
+def test_expand_periods_only_emits_live_cells(contracts_df):
+    periods = get_periods(contracts_df)
+    line_idx, period_idx = expand_periods(contracts_df, periods)
+
+    expected = {
+        (i, j)
+        for i, (_, row) in enumerate(contracts_df.iterrows())
+        for j, period in enumerate(pd.to_datetime(periods))
+        if active_check(row["line.start_date"], row["line.end_date"], period)
+        or deferred_check(
+            row["header.booking_date"],
+            row["header.start_date"],
+            row["line.start_date"],
+            period,
+        )
+    }
+    assert set(zip(line_idx, period_idx)) == expected
+    assert len(line_idx) == len(expected)
+
+
+def test_contracts_to_and_from_df(contracts_df):
+    reversed_df = contracts_df.iloc[::-1]
+    contracts = list(contracts_from_df(reversed_df))
+
+    assert [contract.id for contract in contracts] == [3, 2, 1]
+    assert list(contracts_from_df(reversed_df, block_size=2)) == contracts
+    for contract in contracts:
+        assert contract == Contract.from_df(
+            reversed_df[reversed_df["id"] == contract.id]
+        )
+
+    pd.testing.assert_frame_equal(
+        contracts_to_df(contracts[::-1]),
+        pd.concat(
+            [contract.to_df() for contract in contracts[::-1]], ignore_index=True
+        ),
+    )
+
+
+def test_annualize_df_workers(contracts_df):
+    pd.testing.assert_frame_equal(
+        annualize_df(contracts_df, workers=2), annualize_df(contracts_df)
+    )
+
+
+@pytest.mark.parametrize(
+    "by_lines, arr, deferred", list(product([True, False], repeat=3))
+)
+@pytest.mark.parametrize("rollup", ["customer", "line.product", ["customer", "id"]])
+def test_annualize_df_rollup(contracts_df, by_lines, arr, deferred, rollup):
+    cube = annualize_df(contracts_df, by_lines, arr, deferred)
+    expected = cube.groupby(level=rollup).sum()
+
+    result = annualize_df(contracts_df, by_lines, arr, deferred, rollup=rollup)
+    pd.testing.assert_frame_equal(result, expected, check_exact=False)
+
+
+def test_annualize_df_rollup_total(contracts_df):
+    cube = annualize_df(contracts_df)
+    result = annualize_df(contracts_df, rollup="total")
+
+    assert list(result.index) == ["Total"]
+    pd.testing.assert_series_equal(
+        result.iloc[0], cube.sum(), check_exact=False, check_names=False
+    )
+
+
+@pytest.mark.parametrize(
+    "by_lines, arr, deferred", list(product([True, False], repeat=3))
+)
+def test_annualize_df_compact(contracts_df, by_lines, arr, deferred):
+    cube = annualize_df(contracts_df, by_lines, arr, deferred)
+    compact = annualize_df(contracts_df, by_lines, arr, deferred, compact=True)
+
+    assert compact["period"].dtype == "int32"
+    assert isinstance(compact["customer"].dtype, pd.CategoricalDtype)
+    assert isinstance(compact["line.product"].dtype, pd.CategoricalDtype)
+    assert compact["ARR.cents" if arr else "ACV.cents"].dtype == "int64"
+    pd.testing.assert_frame_equal(compact_to_wide(compact, "Month"), cube, atol=0.01)
+
+
+def test_compact_to_wide_after_a_merge(contracts_df):
+    # a merge drops `attrs`, day codes must not be read as months
+    cube = annualize_df(contracts_df, arr=False, granularity="Day")
+    compact = annualize_df(contracts_df, arr=False, compact=True, granularity="Day")
+    owners = contracts_df[["id", "customer"]].drop_duplicates()
+    merged = compact.merge(owners.rename(columns={"customer": "owner"}), on="id")
+
+    pd.testing.assert_frame_equal(compact_to_wide(merged, "Day"), cube, atol=0.01)
+
+
+def test_period_codes_round_trip(contracts_df):
+    periods = get_periods(contracts_df)
+    assert (period_dates(period_codes(periods)) == periods).all()
+
+
+@pytest.mark.parametrize(
+    "interval_str, generalize_leap_year, granularity",
+    [("Day", False, "Month"), ("Quarter", True, "Quarter"), ("Day", False, "Day")],
+)
+def test_annualize_df_interval_and_granularity(
+    contracts_df, interval_str, generalize_leap_year, granularity
+):
+    options = dict(
+        interval_str=interval_str,
+        generalize_leap_year=generalize_leap_year,
+        granularity=granularity,
+    )
+    cube = annualize_df(contracts_df, arr=False, **options)
+    periods = get_periods(contracts_df, granularity)
+
+    expected = {}
+    for contract in contracts_from_df(contracts_df):
+        for line in contract.lines:
+            key = (contract.customer, contract.id, line.product)
+            for period in periods.astype(object):
+                if active_check(line.start_date, line.end_date, period) or (
+                    deferred_check(
+                        contract.header.booking_date,
+                        contract.header.start_date,
+                        line.start_date,
+                        period,
+                    )
+                ):
+                    value = annualize(line, period, interval_str, generalize_leap_year)
+                    cell = expected.setdefault(key, {}).get(period, 0)
+                    expected[key][period] = cell + value
+
+    assert len(cube) == len(expected)
+    for key, row in expected.items():
+        for period, value in row.items():
+            assert cube.loc[key, ("ACV", pd.Timestamp(period))] == pytest.approx(value)
+    assert cube.to_numpy().sum() == pytest.approx(
+        sum(sum(row.values()) for row in expected.values())
+    )
+
+    rollup = annualize_df(contracts_df, arr=False, rollup="customer", **options)
+    pd.testing.assert_frame_equal(
+        rollup, cube.groupby(level="customer").sum(), check_exact=False
+    )
+    compact = annualize_df(contracts_df, arr=False, compact=True, **options)
+    pd.testing.assert_frame_equal(
+        compact_to_wide(compact, granularity), cube, atol=0.01
+    )
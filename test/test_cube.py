@@ -0,0 +1,42 @@
+from datetime import date
+
+from arr import Contract, ContractHeader, ContractLine, CustomerCube, annualize_df
+
+import pandas as pd
+import pytest
+
+
+@pytest.mark.parametrize("arr", [True, False])
+def test_customer_cube_upsert_and_delete(contracts_df, arr):
+    cube = CustomerCube(contracts_df[contracts_df["id"] != 2], arr=arr)
+
+    # extends the period axis backwards w/ a deferred contract
+    cube.upsert(contracts_df[contracts_df["id"] == 2])
+    pd.testing.assert_frame_equal(cube.df, annualize_df(contracts_df, arr=arr))
+
+    # amendment, extending the period axis forwards
+    amended = Contract(
+        3,
+        ContractHeader(5_000, date(2024, 2, 10), date(2027, 2, 9)),
+        [ContractLine(5_000, date(2024, 2, 10), date(2027, 2, 9), "B", True)],
+        "Customer3",
+    )
+    cube.upsert(amended)
+    expected = pd.concat(
+        [contracts_df[contracts_df["id"] != 3], amended.to_df()], ignore_index=True
+    )
+    pd.testing.assert_frame_equal(cube.df, annualize_df(expected, arr=arr))
+
+    # cancellation, shrinking the period axis again
+    cube.delete([2, amended])
+    expected = contracts_df[contracts_df["id"] == 1]
+    pd.testing.assert_frame_equal(cube.df, annualize_df(expected, arr=arr))
+
+
+def test_customer_cube_empty_book(contracts_df):
+    cube = CustomerCube(contracts_df)
+    cube.delete(contracts_df["id"].unique())
+    assert cube.df.empty and not len(cube.periods)
+
+    cube.upsert(contracts_df)
+    pd.testing.assert_frame_equal(cube.df, annualize_df(contracts_df))
@@ -0,0 +1,138 @@
+from datetime import date
+
+from arr import Contract, ContractHeader, ContractLine, annualize_df
+from arr.contract import contracts_to_df
+from arr.cuts import CUTS, arr_bridge_df, classify_movements, up_for_renewal_df
+from arr.retention import retention_df
+
+import pandas as pd
+import pytest
+
+
+def test_classify_movements(cube):
+    movements = classify_movements(cube).reset_index()
+    assert (movements["period"] == "2025-01-31").all()
+    assert list(movements.drop(columns="period").itertuples(index=False)) == [
+        ("Customer1", "A", "Expansion", 5_000),
+        ("Customer1", "B", "Product Churn", -3_000),
+        ("Customer1", "C", "X-Sale", 4_000),
+        ("Customer2", "A", "Customer Churn", -6_000),
+        ("Customer3", "B", "New Customer", 1_000),
+    ]
+
+
+def test_arr_bridge_df(cube):
+    bridge = arr_bridge_df(cube)
+    assert len(bridge) == 23
+    pd.testing.assert_series_equal(
+        bridge["ARR"] + bridge[CUTS].sum(axis=1),
+        bridge["Ending ARR"],
+        check_names=False,
+    )
+    assert bridge.loc["2025-01-31"].to_dict() == {
+        "ARR": 14_000,
+        "New Customer": 1_000,
+        "X-Sale": 4_000,
+        "Expansion": 5_000,
+        "Product Downgrade": 0,
+        "Product Churn": -3_000,
+        "Customer Churn": -6_000,
+        "Ending ARR": 15_000,
+    }
+
+    by_customer = arr_bridge_df(cube, by="customer")
+    pd.testing.assert_frame_equal(
+        by_customer.groupby(level="period").sum(), bridge, check_freq=False
+    )
+
+
+@pytest.mark.parametrize("by", [None, "customer"])
+def test_bridge_longer_than_the_cube(cube, by):
+    months = cube.shape[1]
+    assert classify_movements(cube, months).empty
+
+    bridge = arr_bridge_df(cube, by, months)
+    assert bridge.empty
+    assert list(bridge.columns) == list(arr_bridge_df(cube, by).columns)
+
+
+@pytest.mark.parametrize("months", [0, -1])
+def test_movements_need_a_month(cube, months):
+    with pytest.raises(ValueError, match="months"):
+        classify_movements(cube, months)
+    with pytest.raises(ValueError, match="months"):
+        arr_bridge_df(cube, months=months)
+
+
+def test_up_for_renewal_df(contracts_df):
+    df = up_for_renewal_df(contracts_df)
+
+    assert df.columns.names == annualize_df(contracts_df).columns.names
+    assert df["ARR"].sum().to_dict() == {
+        pd.Timestamp("2024-02-29"): 0,
+        pd.Timestamp("2024-12-31"): 4_000,
+        pd.Timestamp("2025-01-31"): 5_000 + 6_000,
+        pd.Timestamp("2025-12-31"): 6_000,
+        pd.Timestamp("2026-12-31"): 8_000,
+    }
+    assert df.loc[("Customer2", 2, "C"), ("ARR", "2025-01-31")] == 6_000
+
+
+def test_up_for_renewal_in_the_last_month():
+    # the 12th is earlier in the month than the 20th, `get_periods` ends in Jan
+    df = Contract(
+        1,
+        ContractHeader(13_000, date(2024, 1, 20), date(2025, 2, 12)),
+        [ContractLine(13_000, date(2024, 1, 20), date(2025, 2, 12), "A", True)],
+        "Customer1",
+    ).to_df()
+    assert up_for_renewal_df(df)["ARR"].sum().to_dict() == {
+        pd.Timestamp("2025-02-28"): 12_000
+    }
+
+
+def test_up_for_renewal_nothing_renewable(contracts_df):
+    not_renewable = contracts_df[contracts_df["line.renewable"] == False]
+    pd.testing.assert_frame_equal(
+        up_for_renewal_df(not_renewable), annualize_df(not_renewable)
+    )
+
+
+def test_year_over_year_bridge(cube):
+    # new in February, churned in November, never there at either end
+    short = Contract(
+        4,
+        ContractHeader(1_000, date(2024, 2, 1), date(2024, 11, 15)),
+        [ContractLine(1_000, date(2024, 2, 1), date(2024, 11, 15), "A", True)],
+        "Customer4",
+    )
+    df = pd.concat([cube, annualize_df(contracts_to_df([short]))], axis=0).fillna(0)
+
+    bridge = arr_bridge_df(df, months=12)
+    assert list(bridge.index) == list(
+        pd.date_range("2025-01-31", periods=12, freq="ME")
+    )
+    assert bridge.loc["2025-01-31"].to_dict() == {
+        "ARR": 14_000,
+        "New Customer": 1_000,
+        "X-Sale": 4_000,
+        "Expansion": 5_000,
+        "Product Downgrade": 0,
+        "Product Churn": -3_000,
+        "Customer Churn": -6_000,
+        "Ending ARR": 15_000,
+    }
+    movements = classify_movements(df, months=12).xs("2025-01-31", level="period")
+    assert "Customer4" not in movements.index.get_level_values("customer")
+    # the 12 monthly bridges count Customer4 as new & churned
+    monthly = arr_bridge_df(df).loc["2024-02-29":"2025-01-31"]
+    assert monthly["New Customer"].sum() == 1_000 + 12_000 / 9
+
+
+@pytest.mark.parametrize("granularity", ["Quarter", "Day"])
+def test_monthly_cube_only(contracts_df, granularity):
+    cube = annualize_df(contracts_df, granularity=granularity)
+    with pytest.raises(ValueError, match="monthly"):
+        arr_bridge_df(cube)
+    with pytest.raises(ValueError, match="monthly"):
+        retention_df(cube)
@@ -0,0 +1,105 @@
+from arr import forecast_arr_df, simulate_arr_paths
+from arr.contract import annualize_rollup_df
+from arr.forecast import expiring_contracts
+from data.build_contracts import generate_contracts
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def test_expiring_contracts(contracts_df):
+    expiring = expiring_contracts(contracts_df, "2024-06-30")
+
+    # contract 3 ended in February, without a renewal
+    assert list(expiring.index) == [1, 2]
+    assert expiring.loc[1, "ARR"] == 8_000
+    assert expiring.loc[1, "term"] == 36
+    assert expiring.loc[2, "end_date"] == pd.Timestamp("2025-01-14")
+
+
+def test_renewed_contracts_are_not_expiring():
+    df = generate_contracts(0, 50)
+    expiring = expiring_contracts(df, df["header.booking_date"].max())
+    last = df.groupby("customer")["id"].max()
+    assert set(expiring.index) <= set(last)
+
+
+def test_without_renewals_paths_are_the_contracted_arr(contracts_df):
+    paths = simulate_arr_paths(
+        contracts_df, "2024-06-30", months=12, paths=5, renewal_chance=0
+    )
+    contracted = annualize_rollup_df(contracts_df, "total")
+
+    assert paths.shape == (5, 12)
+    for period in paths.columns:
+        expected = contracted[period].iloc[0] if period in contracted else 0
+        np.testing.assert_allclose(paths[period], expected)
+
+
+def test_certain_renewals_keep_arr(contracts_df):
+    paths = simulate_arr_paths(
+        contracts_df,
+        "2024-06-30",
+        months=30,
+        paths=3,
+        renewal_chance=1,
+        expansion_chance=0,
+        downgrade_chance=0,
+    )
+    # contract 2 renews mid January at its 5k + 6k exit ARR, next to the
+    # ramp of contract 1
+    assert (paths[("ARR", pd.Timestamp("2025-01-31"))] == 6_000 + 11_000).all()
+    assert (paths[("ARR", pd.Timestamp("2026-12-31"))] == 8_000 + 11_000).all()
+
+
+@pytest.fixture
+def book():
+    return generate_contracts(seed=3, customers=300)
+
+
+def test_seeded_paths_dont_depend_on_workers(book, monkeypatch):
+    monkeypatch.setattr("arr.forecast.BATCH_PATHS", 8)
+    args = dict(as_of="2024-12-31", months=12, paths=20, seed=7)
+    single = simulate_arr_paths(book, **args)
+
+    pd.testing.assert_frame_equal(single, simulate_arr_paths(book, **args, workers=2))
+    # batches get their own streams
+    assert not np.allclose(single.iloc[0], single.iloc[8])
+
+
+def test_forecast_percentiles(book):
+    forecast = forecast_arr_df(book, "2024-12-31", months=24, paths=200, seed=0)
+
+    assert list(forecast.index) == [5, 25, 50, 75, 95]
+    assert forecast.columns[0] == ("ARR", pd.Timestamp("2025-01-31"))
+    assert len(forecast.columns) == 24
+    assert (forecast.diff().iloc[1:] >= 0).all().all()
+    # uncertainty grows with the horizon
+    spread = forecast.loc[95] - forecast.loc[5]
+    assert spread.iloc[-1] > spread.iloc[0]
+
+
+def test_no_paths(contracts_df):
+    with pytest.raises(ValueError, match="paths"):
+        simulate_arr_paths(contracts_df, "2024-06-30", paths=0)
+
+
+def test_nothing_contracted_in_the_horizon(contracts_df):
+    # contract 2 ended on 2025-01-14, it's still in its grace window
+    book = contracts_df[contracts_df["id"] == 2]
+    paths = simulate_arr_paths(
+        book, "2025-01-20", months=6, paths=2, renewal_chance=1, downgrade_chance=0
+    )
+    assert paths.shape == (2, 6)
+    assert (paths.to_numpy() >= 11_000).all()
+
+    no_arr = contracts_df.assign(**{"line.renewable": False})
+    assert (
+        (simulate_arr_paths(no_arr, "2024-06-30", months=3, paths=2) == 0).all().all()
+    )
+
+
+def test_no_months(contracts_df):
+    with pytest.raises(ValueError, match="months"):
+        simulate_arr_paths(contracts_df, "2024-06-30", months=0)
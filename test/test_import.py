@@ -0,0 +1,51 @@
+import subprocess
+import sys
+
+HEAVY = ["pandas", "numpy", "dateutil", "IPython"]
+
+
+def run(code: str) -> str:
+    return subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout.strip()
+
+
+def test_import_is_light():
+    loaded = run(
+        "import sys, arr; "
+        f"print([m for m in {HEAVY!r} if m in sys.modules])"
+    )
+    assert loaded == "[]"
+
+
+def test_scalar_api_is_light():
+    loaded = run(
+        "import sys\n"
+        "from datetime import date\n"
+        "from arr import Contract, ContractHeader, ContractLine, annualize\n"
+        "header = ContractHeader(1200, date(2024, 1, 1), date(2024, 12, 31))\n"
+        "line = ContractLine(1200, date(2024, 1, 1), date(2024, 12, 31), 'A', True)\n"
+        "contract = Contract(1, header, [line], 'Customer')\n"
+        "assert annualize(line, date(2024, 6, 30), 'Month') == 1200\n"
+        "assert annualize(header, date(2024, 6, 30), 'Month') == 1200\n"
+        f"print([m for m in {HEAVY!r} if m in sys.modules])"
+    )
+    assert loaded == "[]"
+
+
+def test_import_time():
+    # generous bound, catches an eager pandas import (~1s) creeping back in
+    out = run(
+        "import time; start = time.perf_counter(); import arr; "
+        "print(time.perf_counter() - start)"
+    )
+    assert float(out) < 0.5
+
+
+def test_lazy_attributes():
+    loaded = run(
+        "import sys, arr; arr.ContractBook; "
+        "print('pandas' in sys.modules, "
+        "arr.contract.pd.get_option('display.max_columns'))"
+    )
+    assert loaded == "True 100"
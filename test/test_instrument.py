@@ -0,0 +1,56 @@
+from arr import Instrumentation, annualize_df
+from arr.cube import CustomerCube
+from arr.instrument import _NULL_STAGE, stage
+
+import pytest
+
+
+def test_disabled_is_a_no_op():
+    with stage("anything", 10) as s:
+        s.rows_out = 5
+    assert s is _NULL_STAGE
+
+
+def test_annualize_df_stages(contracts_df):
+    seen = []
+    with Instrumentation(callback=seen.append, memory=True) as stats:
+        df = annualize_df(contracts_df)
+
+    names = [stage.name for stage in stats.stages]
+    assert names == [
+        "annualize",
+        "expand_periods",
+        "cells",
+        "groupby",
+        "unstack",
+        "fillna",
+    ]
+    assert seen == stats.stages
+    assert stats.stages[0].rows_in == (contracts_df["line.renewable"] == True).sum()
+    assert stats.stages[-1].rows_out == len(df)
+    for record in stats.to_records():
+        assert record["seconds"] >= 0
+        assert record["peak_bytes"] >= 0
+
+    # nothing is recorded once the block is left
+    annualize_df(contracts_df)
+    assert len(stats.stages) == 6
+
+
+def test_callback_can_abort(contracts_df):
+    def limit_cells(stage):
+        if stage.name == "expand_periods" and stage.rows_out > 10:
+            raise MemoryError(f"{stage.rows_out:,} cells")
+
+    with pytest.raises(MemoryError):
+        with Instrumentation(callback=limit_cells):
+            annualize_df(contracts_df)
+
+
+def test_cube_stages(contracts_df):
+    with Instrumentation() as stats:
+        CustomerCube(contracts_df).delete(3)
+
+    names = [stage.name for stage in stats.stages]
+    assert names[-1] == "merge"
+    assert "unstack" in names
@@ -0,0 +1,52 @@
+from datetime import date, timedelta
+import random
+
+from arr import get_calendar, get_end_of_month_range
+
+import numpy as np
+import pytest
+
+
+def test_month_matches_get_end_of_month_range():
+    rng = random.Random(0)
+    for _ in range(500):
+        start = date(2019, 1, 1) + timedelta(rng.randint(0, 2_000))
+        end = start + timedelta(rng.randint(1, 1_500))
+        np.testing.assert_array_equal(
+            get_calendar(start, end).periods,
+            get_end_of_month_range(start, end).astype("datetime64[D]"),
+        )
+
+
+def test_memoized_and_read_only():
+    calendar = get_calendar(date(2024, 1, 1), date(2024, 12, 31))
+    assert get_calendar(date(2024, 1, 1), date(2024, 12, 31)) is calendar
+    with pytest.raises(ValueError):
+        calendar.periods[0] = np.datetime64("2000-01-31")
+
+
+@pytest.mark.parametrize(
+    "granularity, periods, lengths, is_leap",
+    [
+        (
+            "Quarter",
+            ["2023-12-31", "2024-03-31", "2024-06-30", "2024-09-30", "2024-12-31"],
+            [92, 91, 91, 92, 92],
+            [False, True, True, True, True],
+        ),
+        ("Year", ["2023-12-31", "2024-12-31"], [365, 366], [False, True]),
+    ],
+)
+def test_granularity(granularity, periods, lengths, is_leap):
+    calendar = get_calendar(date(2023, 11, 15), date(2025, 2, 1), granularity)
+    np.testing.assert_array_equal(calendar.periods, np.array(periods, "datetime64[D]"))
+    np.testing.assert_array_equal(calendar.lengths, lengths)
+    np.testing.assert_array_equal(calendar.is_leap, is_leap)
+
+
+def test_day():
+    calendar = get_calendar(date(2024, 2, 27), date(2024, 3, 2), "Day")
+    assert len(calendar) == 5
+    assert calendar.periods[2] == np.datetime64("2024-02-29")
+    assert calendar.codes.dtype == np.int32
+    assert (calendar.lengths == 1).all()
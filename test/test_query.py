@@ -0,0 +1,61 @@
+from datetime import date
+from itertools import product
+
+from arr import ARRIndex, annualize_df
+from arr.contract import get_periods
+from data.build_contracts import generate_contracts
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.mark.parametrize(
+    "by_lines, arr, deferred", list(product([True, False], repeat=3))
+)
+def test_matches_cube(contracts_df, by_lines, arr, deferred):
+    cube = annualize_df(contracts_df, by_lines, arr, deferred)
+    periods = get_periods(contracts_df)
+    cube = cube[cube.columns.get_level_values(0)[0]].reindex(
+        columns=periods.astype("datetime64[ns]"), fill_value=0
+    )
+    index = ARRIndex(contracts_df, by_lines, arr, deferred)
+
+    np.testing.assert_allclose(index.query(periods), cube.sum().to_numpy())
+    for (customer, id, product_), row in cube.iterrows():
+        np.testing.assert_allclose(
+            index.query(periods, customer, product_, id), row.to_numpy()
+        )
+    for customer, rows in cube.groupby(level="customer"):
+        np.testing.assert_allclose(
+            index.query(periods, customer=customer), rows.sum().to_numpy()
+        )
+    for product_, rows in cube.groupby(level="line.product"):
+        np.testing.assert_allclose(
+            index.query(periods, product=product_), rows.sum().to_numpy()
+        )
+
+
+def test_any_date(contracts_df):
+    index = ARRIndex(contracts_df)
+
+    # contract 2 is deferred until Jan 15 2024, line C starts Mar 1 2024
+    assert index.query(date(2020, 1, 1), contract=2) == 5_000
+    assert index.query(date(2024, 1, 14), contract=2) == 5_000
+    assert index.query(date(2024, 2, 29), contract=2) == pytest.approx(5_000)
+    assert index.query(date(2024, 3, 1), contract=2) == pytest.approx(11_000)
+    assert index.query(date(2025, 1, 14), contract=2) == pytest.approx(11_000)
+    assert index.query(date(2025, 1, 15), contract=2) == 0
+
+    assert index.query(date(2024, 6, 15), "Customer1", "A") == 4_000
+    assert index.query(date(2024, 6, 15), "Customer1", "B") == 0
+    assert index.query(date(2024, 6, 15), customer="Nobody") == 0
+
+
+def test_churned_customers_are_zero():
+    df = generate_contracts(1, 150)
+    index = ARRIndex(df)
+    last_end = df[df["line.renewable"]].groupby("customer")["line.end_date"].max()
+
+    for customer, end in last_end.items():
+        assert index.query(end + pd.Timedelta(days=1), customer=customer) == 0
@@ -0,0 +1,68 @@
+from datetime import date
+
+from arr import Contract, ContractHeader, ContractLine, link_renewals
+from arr.contract import contracts_to_df
+from arr.renewal import RENEWAL_COLUMNS
+from data.build_contracts import generate_contracts
+
+import pandas as pd
+import pytest
+
+
+def contract(id, customer, start, end, products):
+    return Contract(
+        id,
+        ContractHeader(1_000 * len(products), start, end),
+        [ContractLine(1_000, start, end, product, True) for product in products],
+        customer,
+    )
+
+
+@pytest.fixture
+def chain_df():
+    return contracts_to_df(
+        [
+            contract(1, "Customer1", date(2023, 1, 1), date(2023, 12, 31), "AB"),
+            contract(2, "Customer1", date(2024, 1, 1), date(2024, 12, 31), "A"),
+            # late renewal, 20 days without a contract
+            contract(3, "Customer1", date(2025, 1, 21), date(2025, 12, 31), "AC"),
+            # too late for the grace window
+            contract(4, "Customer2", date(2023, 1, 1), date(2023, 12, 31), "A"),
+            contract(5, "Customer2", date(2024, 3, 1), date(2024, 12, 31), "A"),
+        ]
+    )
+
+
+def test_link_renewals(chain_df):
+    df = link_renewals(chain_df, grace_days=30)
+
+    assert list(df.columns) == list(chain_df.columns) + RENEWAL_COLUMNS
+    links = {
+        (id, product): (predecessor, successor, gap)
+        for id, product, predecessor, successor, gap in df[
+            ["id", "line.product"] + RENEWAL_COLUMNS
+        ].itertuples(index=False)
+    }
+    assert links[(1, "A")] == (pd.NA, 2, pd.NA)
+    assert links[(1, "B")] == (pd.NA, pd.NA, pd.NA)
+    assert links[(2, "A")] == (1, 3, 0)
+    assert links[(3, "A")] == (2, pd.NA, 20)
+    assert links[(3, "C")] == (pd.NA, pd.NA, pd.NA)
+    assert links[(5, "A")] == (pd.NA, pd.NA, pd.NA)
+
+    assert link_renewals(chain_df, grace_days=10).loc[5, "line.predecessor_id"] is pd.NA
+
+
+def test_ramp_is_not_a_renewal(contracts_df):
+    df = link_renewals(contracts_df)
+    assert df["line.predecessor_id"].isna().all()
+    pd.testing.assert_frame_equal(df[contracts_df.columns], contracts_df)
+
+
+def test_generated_renewals_are_linked():
+    df = link_renewals(generate_contracts(0, 50))
+    renewed = df["line.predecessor_id"].notna()
+
+    assert renewed.any()
+    assert (df.loc[renewed, "line.gap_days"] == 0).all()
+    assert (df.loc[renewed, "line.predecessor_id"] < df.loc[renewed, "id"]).all()
@@ -0,0 +1,59 @@
+from arr import retention_df
+from arr.retention import RETENTION_COLUMNS, first_arr_period
+
+import pandas as pd
+import pytest
+
+
+def test_first_arr_period(cube):
+    cohorts = first_arr_period(cube)
+    assert cohorts.to_dict() == {
+        "Customer1": pd.Timestamp("2024-01-31"),
+        "Customer2": pd.Timestamp("2024-01-31"),
+        "Customer3": pd.Timestamp("2025-01-31"),
+    }
+
+
+def test_retention_df(cube):
+    retention = retention_df(cube)
+
+    assert list(retention.columns) == RETENTION_COLUMNS
+    # 12 months after the first period
+    assert retention.index[0] == pd.Timestamp("2025-01-31")
+    # Customer1 8k -> 14k, Customer2 6k -> churned, Customer3 is too new
+    dec = retention.loc["2025-12-31"]
+    assert dec["Starting ARR"] == pytest.approx(14_000)
+    assert dec["NRR"] == pytest.approx(1)
+    assert dec["GRR"] == pytest.approx(8 / 14)
+    assert dec["Logo Retention"] == 0.5
+
+
+def test_retention_by_product(cube):
+    retention = retention_df(cube, by="line.product").loc[
+        pd.IndexSlice[:, "2025-12-31"], :
+    ]
+    retention = retention.droplevel("period")
+
+    assert retention.loc["A", "NRR"] == pytest.approx(10 / 11)
+    assert retention.loc["A", "GRR"] == pytest.approx(5 / 11)
+    assert retention.loc["A", "Logo Retention"] == 0.5
+    assert retention.loc["B", "NRR"] == 0
+    assert retention.loc["C", "Starting Customers"] == 0
+
+
+def test_retention_by_cohort(cube):
+    retention = retention_df(cube, months=1, by="cohort")
+    jan = retention.xs(pd.Timestamp("2025-01-31"), level="period")
+
+    assert jan.loc["2024-01-31", "Starting ARR"] == pytest.approx(14_000)
+    assert jan.loc["2024-01-31", "Logo Retention"] == 0.5
+    # Customer3 signed in Jan 2025, nothing to retain yet
+    assert jan.loc["2025-01-31", "Starting Customers"] == 0
+    assert jan.loc["2025-01-31", "Starting ARR"] == 0
+
+    total = retention_df(cube, months=1)
+    pd.testing.assert_frame_equal(
+        retention.groupby(level="period")[RETENTION_COLUMNS[:5]].sum(),
+        total[RETENTION_COLUMNS[:5]],
+        check_dtype=False,
+    )
@@ -0,0 +1,50 @@
+from arr import CubeRollups, annualize_df
+from arr.rollup import STANDARD_LEVELS
+
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def cube(contracts_df):
+    return annualize_df(contracts_df, arr=False)
+
+
+def test_standard_levels(cube):
+    rollups = CubeRollups(cube)
+
+    for name, by in STANDARD_LEVELS.items():
+        if by:
+            expected = cube["ACV"].groupby(level=list(by)).sum()
+            pd.testing.assert_frame_equal(rollups[name], expected)
+        else:
+            pd.testing.assert_series_equal(
+                rollups[name], cube["ACV"].sum(), check_names=False
+            )
+
+
+def test_derived_from_cached_level(cube):
+    rollups = CubeRollups(cube)
+    # mark the contract level, `id` should be summed from it & not the cube
+    rollups._levels[("customer", "id")] *= 2
+
+    by_id = rollups.rollup("id")
+    pd.testing.assert_frame_equal(by_id, cube["ACV"].groupby(level="id").sum() * 2)
+    assert ("id",) in rollups.levels
+
+
+def test_get(cube):
+    rollups = CubeRollups(cube)
+
+    per_product = rollups.get("product", customer="Customer1")
+    expected = cube["ACV"].loc["Customer1"].groupby(level="line.product").sum()
+    pd.testing.assert_frame_equal(per_product, expected)
+
+    total = rollups.get(product=["A", "C"], periods=slice("2024-01-31", "2024-06-30"))
+    expected = cube["ACV"].loc[pd.IndexSlice[:, :, ["A", "C"]], :].sum()
+    pd.testing.assert_series_equal(
+        total, expected.loc["2024-01-31":"2024-06-30"], check_names=False
+    )
+
+    with pytest.raises(KeyError):
+        rollups.rollup("period")
@@ -0,0 +1,50 @@
+from arr import annualize_df, annualize_snapshots_df
+from arr.contract import annualize_rollup_df, get_periods
+from data.build_contracts import generate_contracts
+
+import numpy as np
+import pandas as pd
+import pytest
+
+KNOWN_AT = ["2023-06-30", "2023-12-31", "2024-01-31", "2024-06-30"]
+
+
+def booked_by(df, known_at):
+    return df[df["header.booking_date"] <= pd.Timestamp(known_at)]
+
+
+def test_snapshots_match_a_cube_per_date(contracts_df):
+    snapshots = annualize_snapshots_df(contracts_df, KNOWN_AT)
+
+    # nothing is booked by 2023-06-30 but contract 2
+    assert set(snapshots.index.get_level_values("known_at")) == set(
+        pd.to_datetime(KNOWN_AT)
+    )
+    for known_at in KNOWN_AT:
+        expected = annualize_df(booked_by(contracts_df, known_at))
+        snapshot = snapshots.xs(pd.Timestamp(known_at), level="known_at")
+        snapshot = snapshot.loc[:, (snapshot != 0).any()]
+        expected = expected.loc[:, (expected != 0).any()]
+        pd.testing.assert_frame_equal(
+            snapshot, expected, check_dtype=False, check_index_type=False
+        )
+
+
+@pytest.mark.parametrize("rollup", ["total", "customer", ["customer", "line.product"]])
+def test_snapshot_rollups(rollup):
+    df = generate_contracts(seed=5, customers=200)
+    periods = get_periods(df)
+    known_at = periods[::6]
+    snapshots = annualize_snapshots_df(df, known_at, rollup=rollup)
+
+    for day in known_at:
+        expected = annualize_rollup_df(booked_by(df, day), rollup, periods=periods)
+        snapshot = snapshots.xs(pd.Timestamp(day), level="known_at")
+        snapshot = snapshot.loc[:, expected.columns]
+        np.testing.assert_allclose(snapshot.to_numpy(), expected.to_numpy())
+        assert list(snapshot.index) == list(expected.index)
+
+
+def test_lines_booked_after_the_last_snapshot_are_left_out(contracts_df):
+    snapshots = annualize_snapshots_df(contracts_df, ["2023-12-31"], rollup="customer")
+    assert list(snapshots.index.get_level_values("customer")) == ["Customer2"]
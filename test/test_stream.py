@@ -0,0 +1,24 @@
+from arr import annualize_df
+from arr.stream import annualize_totals, iter_annualize_df, read_contract_chunks
+
+import numpy as np
+import pandas as pd
+
+
+def test_streaming_matches_annualize_df(contracts_df, tmp_path):
+    start = contracts_df.select_dtypes("datetime64").min().min().date()
+    end = contracts_df.select_dtypes("datetime64").max().max().date()
+    chunks = (contracts_df.iloc[i : i + 2] for i in range(0, len(contracts_df), 2))
+
+    partitions = list(iter_annualize_df(chunks, start, end))
+    assert len(partitions) == 3
+    expected = annualize_df(contracts_df)
+    pd.testing.assert_frame_equal(
+        pd.concat(partitions).fillna(0).sort_index(axis=1), expected
+    )
+
+    path = tmp_path / "contracts.csv"
+    contracts_df.to_csv(path, index=False)
+    totals = annualize_totals(read_contract_chunks(path, chunksize=3), start, end)
+    np.testing.assert_allclose(totals, expected["ARR"].sum())
+    assert (totals.index == expected["ARR"].columns).all()
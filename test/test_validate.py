@@ -0,0 +1,71 @@
+from arr import validate_contracts
+from arr.validate import RULES, ContractValidationError
+
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def valid_df(contracts_df):
+    # contract 1's header doesn't match its ramp lines, contract 3 is zero-term
+    df = contracts_df[contracts_df["id"] == 2].reset_index(drop=True)
+    return df
+
+
+def test_valid(valid_df):
+    report = validate_contracts(valid_df)
+    assert report.ok
+    assert report.rows == 2
+    assert (report.summary() == 0).all()
+    report.raise_for_violations()
+
+
+def test_fixture_violations(contracts_df):
+    report = validate_contracts(contracts_df)
+
+    summary = report.summary()
+    assert list(summary.index) == list(RULES)
+    assert summary["amount_mismatch"] == 4  # every line of contract 1
+    assert summary["zero_term"] == 1  # contract 3
+    assert summary.drop(["amount_mismatch", "zero_term"]).sum() == 0
+    assert set(report.violations(contracts_df, "zero_term")["id"]) == {3}
+
+
+def test_each_rule(valid_df):
+    bad = pd.concat([valid_df] * 6, ignore_index=True)
+    bad.loc[0:1, "line.amount"] = None
+    bad.loc[2, "id"] = 3  # single line contract now, its amount won't match
+    bad.loc[4, "line.start_date"] = pd.Timestamp("2023-01-01")
+    bad.loc[6, "header.end_date"] = pd.Timestamp("2023-01-01")
+    bad.loc[8, "line.end_date"] = pd.Timestamp("2024-01-01")
+    bad.loc[10:11, "id"] = 10
+
+    report = validate_contracts(bad)
+    flags = report.flags
+
+    assert flags.loc[0, "missing_value"]
+    assert flags.loc[2, "amount_mismatch"]
+    assert flags.loc[4, "line_outside_header"]
+    assert flags.loc[6, "header_end_before_start"]
+    assert flags.loc[8, "line_end_before_start"] & flags.loc[8, "zero_term"]
+    # row 6 changed the header of contract 2, rows 3, 5 & 9 are untouched copies
+    assert flags.loc[[3, 5, 7, 9], "duplicate_id"].all()
+    assert flags.loc[[3, 5, 9], "duplicate_line"].all()
+    # a copy of contract 2 under a new id is fine
+    assert not flags.index.isin([10, 11]).any()
+
+    with pytest.raises(ContractValidationError, match="invalid"):
+        report.raise_for_violations()
+
+
+def test_missing_id_and_header_value(valid_df):
+    df = pd.concat([valid_df] * 2, ignore_index=True)
+    df.loc[0, "id"] = None
+    df.loc[1, "header.booking_date"] = pd.NaT
+    df.loc[2, "header.amount"] = None
+
+    flags = validate_contracts(df).flags
+
+    assert flags.loc[[0, 1, 2], "missing_value"].all()
+    # a missing header value doesn't make another header for contract 2
+    assert not flags["duplicate_id"].any()